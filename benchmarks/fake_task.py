@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""A stand in for the task command serving a synthetic data set, for benchmarks. Pass it as --task_command. Tasks are
+stored one JSON object per line in pending.data and completed.data under the data.location of the TASKRC, so the data
+watcher sees writes the same way it does for task warrior. Supports export, add, modify, done, start, stop, annotate,
+edit and _uuids with filters made of uuids, status:, project:, modified.after:, +tag, -tag, and, or and parentheses
+"""
+
+import json
+import os
+import sys
+import uuid as uuid_lib
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+COMMANDS = {"export", "add", "modify", "done", "start", "stop", "annotate", "edit", "_uuids"}
+# Task warrior's default urgency.age.coefficient and urgency.age.max in days
+AGE_COEFFICIENT = 2.0
+AGE_MAX_DAYS = 365
+KEYWORDS = {"and", "or", "(", ")"}
+TERM_PREFIXES = ("status:", "project:", "modified.after:", "+", "-")
+Task = dict[str, Any]
+Predicate = Callable[[Task], bool]
+
+
+def now() -> str:
+    return datetime.now(tz=timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+def get_export_line(task: Task, timestamp: float) -> str:
+    """Returns the task as task export prints it. Like task warrior, urgency grows with age so it is recalculated on
+    every export without the task's modified time changing
+    """
+    entry: datetime = datetime.strptime(task["entry"], "%Y%m%dT%H%M%SZ").replace(tzinfo=timezone.utc)
+    age: float = min((timestamp - entry.timestamp()) / 86400 / AGE_MAX_DAYS, 1.0)
+    return json.dumps({**task, "urgency": task.get("urgency", 0.0) + AGE_COEFFICIENT * age}) + "\n"
+
+
+def get_data_location() -> Path:
+    with open(os.environ["TASKRC"]) as f:
+        for line in f:
+            key, _, value = line.partition("=")
+            if key.strip() == "data.location":
+                return Path(value.strip())
+    raise SystemExit("data.location missing from TASKRC")
+
+
+def read_tasks(path: Path) -> list[Task]:
+    if not path.exists():
+        return []
+    with path.open() as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def write_tasks(path: Path, tasks: list[Task]) -> None:
+    tmp_path: Path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with tmp_path.open("w") as f:
+        for task in tasks:
+            f.write(json.dumps(task) + "\n")
+    os.replace(tmp_path, path)
+
+
+def is_uuid_term(term: str) -> bool:
+    return not term.startswith(TERM_PREFIXES) and term not in KEYWORDS
+
+
+def parse_term(term: str) -> Predicate:
+    if term.startswith("status:"):
+        return lambda task: task["status"] == term.removeprefix("status:")
+    if term.startswith("project:"):
+        project: str = term.removeprefix("project:")
+        return lambda task: task.get("project") == project or task.get("project", "").startswith(f"{project}.")
+    if term.startswith("modified.after:"):
+        after: str = term.removeprefix("modified.after:")
+        return lambda task: task.get("modified", "") > after
+    if term.startswith("+"):
+        return lambda task: term[1:] in task.get("tags", [])
+    if term.startswith("-"):
+        return lambda task: term[1:] not in task.get("tags", [])
+    uuids: set[str] = set(term.split(","))
+    return lambda task: task["uuid"] in uuids
+
+
+def parse_filter(tokens: list[str]) -> Predicate:
+    """Recursive descent over or, and and parentheses, and binding tighter than or"""
+    position: list[int] = [0]
+
+    def peek() -> Optional[str]:
+        return tokens[position[0]] if position[0] < len(tokens) else None
+
+    def parse_or() -> Predicate:
+        parts: list[Predicate] = [parse_and()]
+        while peek() == "or":
+            position[0] += 1
+            parts.append(parse_and())
+        return lambda task: any(part(task) for part in parts)
+
+    def parse_and() -> Predicate:
+        parts: list[Predicate] = []
+        while peek() not in (None, "or", ")"):
+            if peek() == "and":
+                position[0] += 1
+                continue
+            if peek() == "(":
+                position[0] += 1
+                parts.append(parse_or())
+                position[0] += 1
+                continue
+            # Like task warrior, adjacent uuids are a list of tasks rather than terms that must all match
+            uuids: list[str] = []
+            while (token := peek()) is not None and is_uuid_term(token):
+                uuids.append(token)
+                position[0] += 1
+            if uuids:
+                parts.append(parse_term(",".join(uuids)))
+            else:
+                parts.append(parse_term(tokens[position[0]]))
+                position[0] += 1
+        return lambda task: all(part(task) for part in parts)
+
+    return parse_or()
+
+
+def apply_modify(task: Task, args: list[str]) -> None:
+    for arg in args:
+        if arg.startswith("project:"):
+            task["project"] = arg.removeprefix("project:")
+            if not task["project"]:
+                del task["project"]
+        elif arg.startswith("+"):
+            task["tags"] = sorted(set(task.get("tags", [])) | {arg[1:]})
+        elif arg.startswith("-"):
+            task["tags"] = [tag for tag in task.get("tags", []) if tag != arg[1:]]
+
+
+def main(argv: list[str]) -> int:
+    args: list[str] = [arg for arg in argv if not arg.startswith("rc.")]
+    command_index: int = next((index for index, arg in enumerate(args) if arg in COMMANDS), len(args))
+    filter_args: list[str] = args[:command_index]
+    command: str = args[command_index] if command_index < len(args) else "export"
+    command_args: list[str] = args[command_index:][1:]
+
+    data_location: Path = get_data_location()
+    pending_path: Path = data_location / "pending.data"
+    completed_path: Path = data_location / "completed.data"
+    include_completed: bool = any(arg.startswith(("status:", "modified.after:")) for arg in filter_args)
+    pending: list[Task] = read_tasks(pending_path)
+    tasks: list[Task] = pending + read_tasks(completed_path) if include_completed else pending
+    predicate: Predicate = parse_filter(filter_args)
+    selected: list[Task] = [task for task in tasks if predicate(task)]
+
+    if command == "export":
+        timestamp: float = datetime.now(tz=timezone.utc).timestamp()
+        sys.stdout.write("".join(get_export_line(task, timestamp) for task in selected))
+        return 0
+    if command == "_uuids":
+        sys.stdout.write("".join(task["uuid"] + "\n" for task in selected if task["status"] == "pending"))
+        return 0
+    if command == "add":
+        new_task: Task = {
+            "uuid": str(uuid_lib.uuid4()),
+            "status": "pending",
+            "entry": now(),
+            "modified": now(),
+            "urgency": 0.0,
+            "description": " ".join(arg for arg in command_args if not arg.startswith(("project:", "+", "-"))),
+        }
+        apply_modify(new_task, command_args)
+        write_tasks(pending_path, pending + [new_task])
+        return 0
+    if command == "edit":
+        return 0
+
+    if not selected:
+        print("No matches.", file=sys.stderr)
+        return 1
+
+    completed: list[Task] = []
+    for task in selected:
+        task["modified"] = now()
+        if command == "modify":
+            apply_modify(task, command_args)
+        elif command == "done":
+            task["status"] = "completed"
+            task["end"] = now()
+            completed.append(task)
+        elif command == "start":
+            task["start"] = now()
+        elif command == "stop":
+            task.pop("start", None)
+        elif command == "annotate":
+            task.setdefault("annotations", []).append({"entry": now(), "description": " ".join(command_args)})
+
+    write_tasks(pending_path, [task for task in pending if task["status"] == "pending"])
+    if completed:
+        with completed_path.open("a") as f:
+            for task in completed:
+                f.write(json.dumps(task) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
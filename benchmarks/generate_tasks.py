@@ -0,0 +1,89 @@
+import argparse
+import json
+import random
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Optional
+
+PROJECT_NAMES = ["alpha", "beta", "gamma", "delta", "epsilon", "zeta", "eta", "theta"]
+TAG_NAMES = [f"tag{x}" for x in range(40)] + ["next", "bug", "work", "home", "waiting"]
+WORDS = ["review", "write", "fix", "plan", "call", "check", "update", "draft", "merge", "test", "ship", "read"]
+
+
+def format_date(value: datetime) -> str:
+    return value.strftime("%Y%m%dT%H%M%SZ")
+
+
+def make_project(rng: random.Random) -> Optional[str]:
+    """Projects four levels deep, e.g. alpha.beta.gamma.delta, with a few tasks left without a project"""
+    if rng.random() < 0.05:
+        return None
+    depth: int = rng.randint(1, 4)
+    return ".".join(rng.choice(PROJECT_NAMES) for _ in range(depth))
+
+
+def make_annotations(rng: random.Random, entry: datetime) -> list[dict[str, str]]:
+    annotations: list[dict[str, str]] = []
+    for index in range(rng.choice([0, 0, 0, 1, 2, 3])):
+        lines: list[str] = [" ".join(rng.choices(WORDS, k=8)) for _ in range(rng.randint(1, 4))]
+        annotations.append({"entry": format_date(entry + timedelta(hours=index + 1)), "description": "\n".join(lines)})
+    return annotations
+
+
+def generate_tasks(count: int, seed: int = 0) -> list[dict[str, Any]]:
+    """Generates count pending tasks in task export form. The same count and seed always give the same tasks"""
+    rng: random.Random = random.Random(seed)
+    now: datetime = datetime.now(tz=timezone.utc).replace(microsecond=0)
+    tasks: list[dict[str, Any]] = []
+    for index in range(count):
+        entry: datetime = now - timedelta(minutes=rng.randint(10, 365 * 24 * 60))
+        task: dict[str, Any] = {
+            "uuid": f"{rng.getrandbits(32):08x}-0000-4000-8000-{index:012x}",
+            "status": "pending",
+            "description": f"{' '.join(rng.choices(WORDS, k=4))} {index}",
+            "entry": format_date(entry),
+            "modified": format_date(entry),
+            "urgency": round(rng.uniform(0, 20), 4),
+        }
+        project: Optional[str] = make_project(rng)
+        if project is not None:
+            task["project"] = project
+        tags: list[str] = rng.sample(TAG_NAMES, rng.choice([0, 0, 1, 2, 3]))
+        if tags:
+            task["tags"] = tags
+        if rng.random() < 0.2:
+            task["due"] = format_date(now + timedelta(hours=rng.randint(-48, 24 * 30)))
+        if rng.random() < 0.02:
+            task["start"] = format_date(now - timedelta(minutes=rng.randint(1, 600)))
+        annotations: list[dict[str, str]] = make_annotations(rng, entry)
+        if annotations:
+            task["annotations"] = annotations
+        tasks.append(task)
+    return tasks
+
+
+def write_data_set(directory: Path, count: int, seed: int = 0) -> Path:
+    """Writes a data set for the fake task command and returns the taskrc pointing at it"""
+    data_location: Path = directory / "data"
+    data_location.mkdir(parents=True, exist_ok=True)
+    with (data_location / "pending.data").open("w") as f:
+        for task in generate_tasks(count, seed):
+            f.write(json.dumps(task) + "\n")
+    (data_location / "completed.data").touch()
+
+    taskrc: Path = directory / "taskrc"
+    taskrc.write_text(f"data.location={data_location}\n")
+    return taskrc
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="write a synthetic data set for benchmarks/fake_task.py")
+    parser.add_argument("directory", help="directory to write the data set and taskrc to")
+    parser.add_argument("--count", type=int, default=10000, help="number of pending tasks")
+    parser.add_argument("--seed", type=int, default=0, help="random seed")
+    args = parser.parse_args()
+    print(write_data_set(Path(args.directory), args.count, args.seed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,342 @@
+"""Drives MainWindow headlessly over synthetic data sets served by fake_task.py, writing the timings as JSON.
+
+    python benchmarks/run_benchmarks.py --sizes 1000 10000 --output results.json
+
+All timings are in seconds. Mutation timings are taken from the key press that submits the action, "visible" is when
+the store shows the change and "settled" is when the command and the refresh after it have finished
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Collection, Optional
+
+BENCHMARKS_DIR: Path = Path(__file__).resolve().parent
+# Benchmark the working tree rather than an installed taskaway
+sys.path.insert(0, str(BENCHMARKS_DIR.parent))
+
+from benchmarks.generate_tasks import write_data_set  # noqa: E402
+from textual import __version__ as textual_version  # noqa: E402
+from textual.pilot import Pilot  # noqa: E402
+from taskaway.constants import TASK_ANNOTATIONS  # noqa: E402
+from taskaway.main import MainWindow  # noqa: E402
+from taskaway.task_export import TaskRecord  # noqa: E402
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+SCREEN_SIZE = (200, 50)
+TIMEOUT_SECONDS = 120.0
+BENCHMARK_TAG = "benchtag"
+BENCHMARK_PROJECT = "benchmark.moved"
+# Tasks marked for the batched mutation
+BATCH_SIZE = 3
+
+
+class BenchmarkTimeout(Exception):
+    pass
+
+
+async def wait_until(predicate: Callable[[], bool], timeout: float = TIMEOUT_SECONDS) -> float:
+    """Polls predicate while the app runs, returning the time it took to become true"""
+    start: float = time.perf_counter()
+    while not predicate():
+        if time.perf_counter() - start > timeout:
+            raise BenchmarkTimeout(f"Timed out after {timeout}s")
+        await asyncio.sleep(0.001)
+    return time.perf_counter() - start
+
+
+def is_loaded(app: MainWindow) -> bool:
+    return app.loaded_signature is not None and app.refresh_view is None and app.snapshot is not None
+
+
+def is_settled(app: MainWindow) -> bool:
+    return not app.store.local_changes and app.refresh_view is None and not app.refresh_pending
+
+
+def has_task_with_description(app: MainWindow, description: str) -> bool:
+    # The store is updated from the loader thread
+    with app.store.lock:
+        return any(task.description == description for task in app.store.tasks.values())
+
+
+def time_calls(call: Callable[[], Any], repeat: int) -> dict[str, float]:
+    timings: list[float] = []
+    for _ in range(repeat):
+        start: float = time.perf_counter()
+        call()
+        timings.append(time.perf_counter() - start)
+    return {"median": statistics.median(timings), "min": min(timings), "max": max(timings)}
+
+
+def create_app(directory: Path, delta_sync: bool) -> MainWindow:
+    return MainWindow(
+        task_configs={"benchmark": directory / "taskrc"},
+        taskaway_config=directory / "taskaway.json",
+        task_command=f"{sys.executable} {BENCHMARKS_DIR / 'fake_task.py'}",
+        delta_sync=delta_sync,
+    )
+
+
+async def benchmark_startup(directory: Path, cached: bool, delta_sync: bool) -> dict[str, float]:
+    """Times start up to the first painted rows and to the first export being shown, saving the snapshot cache for
+    the cached start up that follows
+    """
+    start: float = time.perf_counter()
+    app: MainWindow = create_app(directory, delta_sync)
+    async with app.run_test(size=SCREEN_SIZE):
+        table = app.get_table()
+        await wait_until(lambda: table.row_count > 0)
+        first_paint: float = time.perf_counter() - start
+        await wait_until(lambda: is_loaded(app))
+        first_export: float = time.perf_counter() - start
+        if not cached:
+            app.save_snapshot_cache()
+
+    return {"first_paint": first_paint, "first_export_shown": first_export}
+
+
+def benchmark_view(app: MainWindow, repeat: int) -> dict[str, Any]:
+    """Times redraws, filters and expanding and collapsing projects, calling the same methods the actions do"""
+    results: dict[str, Any] = {
+        "redraw": time_calls(app.redraw, repeat),
+        "redraw_rebuild": time_calls(lambda: app.redraw(rebuild=True), repeat),
+    }
+
+    # The largest top level project, expanding it shows the most rows
+    project: str = max(app.store.projects.root.children.values(), key=lambda node: node.subtree_task_count).path
+
+    def toggle_project() -> None:
+        app.store.projects.toggle_expanded(project)
+        app.redraw()
+
+    results["expand_collapse"] = time_calls(toggle_project, repeat * 2)
+
+    def filter_project() -> None:
+        app.update_project_filter(project)
+        app.redraw()
+        app.update_project_filter("")
+        app.redraw()
+
+    def filter_tag() -> None:
+        app.update_tag_filter("next,bug")
+        app.redraw()
+        app.update_tag_filter("")
+        app.redraw()
+
+    results["filter_project_and_clear"] = time_calls(filter_project, repeat)
+    results["filter_tag_and_clear"] = time_calls(filter_tag, repeat)
+    return results
+
+
+def highlight_task(app: MainWindow, skip: Collection[str] = ()) -> str:
+    """Moves the cursor to a task row that is not active and not in skip, returning its uuid"""
+    for index in range(len(app.row_model)):
+        key: str = app.row_model.get_keys(index, index + 1)[0]
+        task: Optional[TaskRecord] = app.store.get(key)
+        if task is not None and not task.active and key not in skip:
+            app.move_cursor_to_model_index(index)
+            return key
+    raise RuntimeError("No task rows are shown")
+
+
+async def type_text(pilot: Pilot, text: str) -> None:
+    await pilot.press(*["space" if character == " " else character for character in text])
+
+
+async def time_mutation(
+    app: MainWindow,
+    pilot: Pilot,
+    prepare: Callable[[], Awaitable[None]],
+    submit_key: str,
+    is_visible: Callable[[], bool],
+) -> dict[str, float]:
+    await prepare()
+    start: float = time.perf_counter()
+    # Pilot.press returns once the app is idle, by then the command may have finished, so the change is polled for
+    # while the key press is being handled
+    press: asyncio.Task = asyncio.create_task(pilot.press(submit_key))
+    await wait_until(is_visible)
+    visible: float = time.perf_counter() - start
+    await wait_until(lambda: is_settled(app))
+    settled: float = time.perf_counter() - start
+    await press
+    # The data watcher should not trigger another export for the command's own write after this
+    await pilot.pause(0.05)
+    await wait_until(lambda: is_settled(app))
+    return {"visible": visible, "settled": settled}
+
+
+async def benchmark_mutations(app: MainWindow, pilot: Pilot) -> dict[str, dict[str, float]]:
+    results: dict[str, dict[str, float]] = {}
+
+    async def no_input() -> None:
+        pass
+
+    uuid: str = highlight_task(app)
+
+    def current() -> Optional[TaskRecord]:
+        return app.store.get(uuid)
+
+    results["toggle_start_stop"] = await time_mutation(
+        app, pilot, no_input, "b", lambda: (task := current()) is not None and task.active
+    )
+    results["toggle_start_stop_back"] = await time_mutation(
+        app, pilot, no_input, "b", lambda: (task := current()) is not None and not task.active
+    )
+
+    uuid = highlight_task(app)
+
+    async def open_add_tag() -> None:
+        await pilot.press("t")
+        await type_text(pilot, BENCHMARK_TAG)
+
+    results["add_tag"] = await time_mutation(
+        app, pilot, open_add_tag, "enter", lambda: (task := current()) is not None and BENCHMARK_TAG in task.tags
+    )
+
+    async def open_modify_task() -> None:
+        await pilot.press("m")
+        await type_text(pilot, f"-{BENCHMARK_TAG}")
+
+    results["modify_task"] = await time_mutation(
+        app,
+        pilot,
+        open_modify_task,
+        "enter",
+        lambda: (task := current()) is not None and BENCHMARK_TAG not in task.tags,
+    )
+
+    task: Optional[TaskRecord] = current()
+    annotation_count: int = len(task[TASK_ANNOTATIONS]) if task is not None else 0
+
+    async def open_annotate() -> None:
+        await pilot.press("A")
+        await type_text(pilot, "benchmark annotation")
+
+    results["add_annotation"] = await time_mutation(
+        app,
+        pilot,
+        open_annotate,
+        "enter",
+        lambda: (task := current()) is not None and len(task[TASK_ANNOTATIONS]) > annotation_count,
+    )
+
+    async def open_modify_project() -> None:
+        await pilot.press("p")
+        await pilot.press("ctrl+u")
+        await type_text(pilot, f"project:{BENCHMARK_PROJECT}")
+
+    results["modify_project"] = await time_mutation(
+        app,
+        pilot,
+        open_modify_project,
+        "enter",
+        lambda: (task := current()) is not None and task.project == BENCHMARK_PROJECT,
+    )
+
+    uuid = highlight_task(app)
+
+    async def open_done() -> None:
+        await pilot.press("d")
+
+    results["mark_done"] = await time_mutation(app, pilot, open_done, "y", lambda: current() is None)
+
+    marked: list[str] = []
+
+    async def mark_and_open_done() -> None:
+        # Marked tasks are run as one task command for the batch
+        while len(marked) < BATCH_SIZE:
+            marked.append(highlight_task(app, marked))
+            await pilot.press("space")
+        await pilot.press("d")
+
+    results["mark_done_batch"] = await time_mutation(
+        app, pilot, mark_and_open_done, "y", lambda: all(app.store.get(uuid) is None for uuid in marked)
+    )
+
+    description: str = "benchmark added task"
+
+    async def open_add_task() -> None:
+        await pilot.press("a")
+        await pilot.press("ctrl+u")
+        await type_text(pilot, description)
+
+    results["add_task"] = await time_mutation(
+        app,
+        pilot,
+        open_add_task,
+        "enter",
+        lambda: has_task_with_description(app, description),
+    )
+    return results
+
+
+async def benchmark_size(size: int, repeat: int, delta_sync: bool) -> dict[str, Any]:
+    with tempfile.TemporaryDirectory(prefix=f"taskaway-benchmark-{size}-") as tmp:
+        directory: Path = Path(tmp)
+        start: float = time.perf_counter()
+        write_data_set(directory, size)
+        results: dict[str, Any] = {"tasks": size, "generate": time.perf_counter() - start}
+
+        results["startup"] = await benchmark_startup(directory, cached=False, delta_sync=delta_sync)
+        results["startup_cached"] = await benchmark_startup(directory, cached=True, delta_sync=delta_sync)
+
+        app: MainWindow = create_app(directory, delta_sync)
+        async with app.run_test(size=SCREEN_SIZE) as pilot:
+            await wait_until(lambda: is_loaded(app))
+            results["rows"] = len(app.row_model)
+            results["view"] = benchmark_view(app, repeat)
+            results["mutations"] = await benchmark_mutations(app, pilot)
+        return results
+
+
+def get_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=BENCHMARKS_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(sizes: list[int], repeat: int, delta_sync: bool) -> dict[str, Any]:
+    report: dict[str, Any] = {
+        "commit": get_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "textual": textual_version,
+        "platform": platform.platform(),
+        "delta_sync": delta_sync,
+        "results": {},
+    }
+    for size in sizes:
+        print(f"Benchmarking {size} tasks", file=sys.stderr)
+        report["results"][str(size)] = await benchmark_size(size, repeat, delta_sync)
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="benchmark taskaway over synthetic task warrior data sets")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="numbers of tasks to benchmark")
+    parser.add_argument("--repeat", type=int, default=5, help="times to repeat each view timing")
+    parser.add_argument("--output", default="-", help="file to write the JSON results to, - for stdout")
+    parser.add_argument("--delta-sync", action="store_true", help="refresh with delta sync, see taskaway --delta-sync")
+    args = parser.parse_args()
+
+    report: dict[str, Any] = asyncio.run(run(args.sizes, args.repeat, args.delta_sync))
+    output: str = json.dumps(report, indent=4)
+    if args.output == "-":
+        print(output)
+    else:
+        Path(args.output).write_text(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+from typing import Iterable, Optional
+from taskaway.constants import TASK_ANNOTATIONS, TASK_UUID
+from taskaway.task_export import TaskRecord
+from taskaway.utils import format_annotation
+
+
+class AnnotationRenderer:
+    """Renders the annotations column. A task's annotations are shown as a one line summary of the latest
+    annotation and how many others there are, except for the one task that has been expanded, which gets a line per
+    annotation. The formatted lines are cached per task along with the annotations they were formatted from, so they
+    survive changes to the task's other fields, such as the urgency recalculated on every export, but not edits to
+    the annotations that leave their count alone
+    """
+
+    def __init__(self) -> None:
+        self.lines: dict[str, tuple[list[dict[str, str]], list[str]]] = {}
+        self.expanded: Optional[str] = None
+
+    def get_lines(self, task: TaskRecord) -> list[str]:
+        uuid: str = task[TASK_UUID]
+        cached: Optional[tuple[list[dict[str, str]], list[str]]] = self.lines.get(uuid)
+        if cached is not None and cached[0] == task.raw_annotations:
+            return cached[1]
+
+        lines: list[str] = [format_annotation(annotation) for annotation in task[TASK_ANNOTATIONS]]
+        self.lines[uuid] = (task.raw_annotations, lines)
+        return lines
+
+    def render(self, task: TaskRecord) -> tuple[Optional[str], int]:
+        """Returns the annotations cell and the row height it needs"""
+        if not task.raw_annotations:
+            return None, 1
+
+        lines: list[str] = self.get_lines(task)
+        if task[TASK_UUID] == self.expanded:
+            text: str = "\n".join(lines)
+            return text, text.count("\n") + 1
+        # Annotations can span several lines, the summary is kept to one
+        summary: str = " ".join(lines[-1].splitlines())
+        return summary if len(lines) == 1 else f"{summary} (+{len(lines) - 1} more)", 1
+
+    def toggle_expanded(self, task: TaskRecord) -> list[str]:
+        """Expands the task's annotations, collapsing any other expanded task, or collapses them if the task is
+        already expanded. Returns the uuids of the tasks whose rows need rebuilding
+        """
+        uuid: str = task[TASK_UUID]
+        previous: Optional[str] = self.expanded
+        self.expanded = uuid if uuid != previous and len(task.raw_annotations) > 1 else None
+        return [x for x in {previous, self.expanded} if x is not None]
+
+    def forget(self, uuids: Iterable[str]) -> None:
+        for uuid in uuids:
+            self.lines.pop(uuid, None)
+            if uuid == self.expanded:
+                self.expanded = None
@@ -0,0 +1,77 @@
+import argparse
+import shutil
+import sys
+from pathlib import Path
+from typing import Optional
+from taskaway.startup_trace import StartupTrace, mark_stage
+
+
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="taskaway",
+        description="terminal user interface for task warrior",
+    )
+    parser.add_argument(
+        "--task_config",
+        required=False,
+        action="append",
+        help="path for task config file to use, optionally prefixed with a name as in work=~/work/.taskrc. Given "
+        "more than once, the tasks of each are shown under a top level project with its name. Defaults to ~/.task",
+    )
+    parser.add_argument(
+        "--taskaway_config", required=False, default="~/.taskaway.json", help="path for taskaway config file to use"
+    )
+    parser.add_argument("--task_command", required=False, default="task", help="command to run task warrior task")
+    parser.add_argument("--perf-log", required=False, help="file to append per refresh performance records to as JSON")
+    parser.add_argument(
+        "--delta-sync",
+        action="store_true",
+        help="refresh by exporting only the tasks modified since the last export, listing the uuids of all pending "
+        "tasks every couple of minutes to catch tasks removed without being modified",
+    )
+    parser.add_argument(
+        "--startup-trace",
+        action="store_true",
+        help="print import and first paint timings to stderr, exiting once the first task export is shown",
+    )
+    return parser.parse_args()
+
+
+def start_application() -> None:
+    """Entry point. Arguments are parsed and the task command checked before textual and the app are imported, so
+    --help and a missing task command return straight away
+    """
+    startup_trace: StartupTrace = StartupTrace()
+    args = parse_arguments()
+    task_command: str = args.task_command
+    if shutil.which(task_command) is None:
+        print(
+            f"The task command '{task_command}' does not exist. "
+            f"Install task warrior following https://taskwarrior.org/download/#quick-setup."
+        )
+        exit(1)
+    startup_trace.mark("arguments parsed")
+
+    import textual.app  # noqa: F401
+
+    startup_trace.mark("textual imported")
+
+    from taskaway.main import MainWindow
+    from taskaway.task_source import parse_task_configs
+
+    startup_trace.mark("taskaway imported")
+
+    trace: Optional[StartupTrace] = startup_trace if args.startup_trace else None
+    app = MainWindow(
+        task_configs=parse_task_configs(args.task_config or ["~/.task"]),
+        taskaway_config=Path(args.taskaway_config),
+        task_command=task_command,
+        startup_trace=trace,
+        perf_log=Path(args.perf_log) if args.perf_log else None,
+        delta_sync=args.delta_sync,
+    )
+    mark_stage(trace, "app created")
+    app.run()
+
+    if trace is not None:
+        print(trace.report(), file=sys.stderr)
@@ -0,0 +1,123 @@
+import asyncio
+import os
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import AsyncIterator, Iterable, Optional
+from taskaway.constants import TASK_COMMAND_MAX_CONCURRENT, TASK_COMMAND_TIMEOUT_SECONDS
+from taskaway.perf import PerfStats
+from taskaway.task_export import get_taskrc_location
+
+COMMAND_OVERRIDES = [
+    "rc.confirmation=no",
+    "rc.dependency.confirmation=no",
+    "rc.recurrence.confirmation=no",
+    "rc.bulk=0",
+]
+
+
+class TaskCommandError(Exception):
+    pass
+
+
+class TaskCommandRunner:
+    """Runs task warrior commands as asyncio subprocesses so the event loop keeps running while they do. At most
+    max_concurrent commands run at once, and commands touching the same task uuid run in the order they were started
+    """
+
+    def __init__(
+        self,
+        task_command: str,
+        taskrc: Path,
+        max_concurrent: int = TASK_COMMAND_MAX_CONCURRENT,
+        timeout: float = TASK_COMMAND_TIMEOUT_SECONDS,
+        perf: Optional[PerfStats] = None,
+    ) -> None:
+        self.task_command: str = task_command
+        self.taskrc: str = get_taskrc_location(taskrc)
+        self.max_concurrent: int = max_concurrent
+        self.timeout: float = timeout
+        self.perf: PerfStats = perf if perf is not None else PerfStats()
+        # Created on first use so they belong to the running event loop
+        self.semaphore: Optional[asyncio.Semaphore] = None
+        self.uuid_locks: dict[str, asyncio.Lock] = {}
+        self.uuid_lock_users: dict[str, int] = {}
+
+    def get_command(self, args: list[str]) -> list[str]:
+        return self.task_command.split() + COMMAND_OVERRIDES + args
+
+    def get_env(self) -> dict[str, str]:
+        env: dict[str, str] = os.environ.copy()
+        env["TASKRC"] = self.taskrc
+        return env
+
+    def get_semaphore(self) -> asyncio.Semaphore:
+        if self.semaphore is None:
+            self.semaphore = asyncio.Semaphore(self.max_concurrent)
+        return self.semaphore
+
+    @asynccontextmanager
+    async def hold_uuids(self, uuids: Iterable[str]) -> AsyncIterator[None]:
+        # asyncio locks are granted in the order they were requested. They are taken in sorted order so two commands
+        # sharing several uuids can not deadlock
+        ordered_uuids: list[str] = sorted(set(uuids))
+        locks: list[asyncio.Lock] = []
+        for uuid in ordered_uuids:
+            self.uuid_lock_users[uuid] = self.uuid_lock_users.get(uuid, 0) + 1
+            locks.append(self.uuid_locks.setdefault(uuid, asyncio.Lock()))
+
+        acquired: list[asyncio.Lock] = []
+        try:
+            for lock in locks:
+                await lock.acquire()
+                acquired.append(lock)
+            yield
+        finally:
+            for lock in acquired:
+                lock.release()
+            for uuid in ordered_uuids:
+                self.uuid_lock_users[uuid] -= 1
+                if not self.uuid_lock_users[uuid]:
+                    del self.uuid_lock_users[uuid]
+                    del self.uuid_locks[uuid]
+
+    async def run(self, args: list[str], uuids: Iterable[str] = (), interactive: bool = False) -> str:
+        """Runs task with the given args and returns its output. Commands that change tasks should pass the uuids
+        they change so they are ordered against other commands for them. Interactive commands, such as edit, are
+        attached to the terminal and have no timeout. Raises TaskCommandError if task fails or times out
+        """
+        command: list[str] = self.get_command(args)
+        async with self.hold_uuids(uuids), self.get_semaphore():
+            self.perf.count("subprocesses")
+            try:
+                if interactive:
+                    return await self.run_interactive(command)
+                with self.perf.phase("task_command"):
+                    return await self.run_captured(command)
+            except OSError as e:
+                raise TaskCommandError(f"{e}\nCommand used: {' '.join(command)}") from e
+
+    async def run_interactive(self, command: list[str]) -> str:
+        process = await asyncio.create_subprocess_exec(*command, env=self.get_env())
+        if await process.wait():
+            raise TaskCommandError(f"Exited with status {process.returncode}\nCommand used: {' '.join(command)}")
+        return ""
+
+    async def run_captured(self, command: list[str]) -> str:
+        process = await asyncio.create_subprocess_exec(
+            *command,
+            stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            env=self.get_env(),
+        )
+        try:
+            stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+            raise TaskCommandError(f"Timed out after {self.timeout:g}s\nCommand used: {' '.join(command)}")
+
+        if process.returncode:
+            error_msg: str = stderr.decode("utf-8", errors="replace").strip()
+            raise TaskCommandError(f"{error_msg}\nCommand used: {' '.join(command)}")
+        return stdout.decode("utf-8", errors="replace")
@@ -1,6 +1,7 @@
 # Element ID's
 TASK_TABLE_ID = "task_table"
 HELP_TABLE_ID = "help_table"
+PERF_TABLE_ID = "perf_table"
 
 # Table column ID's
 COL_SHORT_PROJECT: str = "project"
@@ -48,3 +49,59 @@ TASK_DUE = "due"
 TASK_CONTEXT = "context"
 TASK_ANNOTATIONS = "annotations"
 TASK_STARTED = "start"
+TASK_MODIFIED = "modified"
+TASK_STATUS = "status"
+
+# Task warrior data storage
+TASK_DATA_LOCATION_KEY = "data.location"
+TASK_DATA_LOCATION_DEFAULT = "~/.task"
+TASK_DATA_FILES = [
+    "pending.data",
+    "completed.data",
+    "backlog.data",
+    "taskchampion.sqlite3",
+    "taskchampion.sqlite3-wal",
+]
+
+# Task warrior commands
+TASK_COMMAND_MAX_CONCURRENT = 4
+TASK_COMMAND_TIMEOUT_SECONDS = 30.0
+
+# The task table holds a window of at most this many rows, moved once the cursor is within the margin of its edges
+VIRTUAL_TABLE_WINDOW_ROWS = 400
+VIRTUAL_TABLE_MARGIN_ROWS = 100
+
+# Sort order fields, a sort order is a comma separated list of fields each followed by + or -, e.g. "urgency-,due+"
+SORT_URGENCY = "urgency"
+SORT_DUE = "due"
+SORT_AGE = "age"
+SORT_PROJECT = "project"
+SORT_DESCRIPTION = "description"
+SORT_FIELDS = [
+    SORT_URGENCY,
+    SORT_DUE,
+    SORT_AGE,
+    SORT_PROJECT,
+    SORT_DESCRIPTION,
+]
+DEFAULT_SORT_ORDER = "project+,description+"
+
+# The snapshot of the last loaded tasks shown on start up, saved next to the taskaway config
+SNAPSHOT_CACHE_SUFFIX = ".cache.json"
+SNAPSHOT_CACHE_VERSION = 2
+
+# Performance stats, the number of recent durations kept per phase and the percentiles shown of them
+PERF_SAMPLES = 500
+PERF_PERCENTILES = [50, 90, 99]
+
+# Refresh ticks check the task data for changes and update time columns. They come every REFRESH_MIN_INTERVAL
+# seconds after user activity or a data change, and back off by REFRESH_BACKOFF on every idle tick
+REFRESH_MIN_INTERVAL = 0.5
+REFRESH_MAX_INTERVAL = 32.0
+REFRESH_BACKOFF = 2.0
+
+# Delta sync exports only the tasks modified since the last export. Every DELTA_SYNC_LISTING_SECONDS the uuids of all
+# pending tasks are listed to find tasks removed without being modified, and tasks missing from the store are exported
+# by uuid, unless there are more than DELTA_SYNC_MAX_FETCH of them when everything is exported again
+DELTA_SYNC_LISTING_SECONDS = 120.0
+DELTA_SYNC_MAX_FETCH = 500
@@ -0,0 +1,74 @@
+import os
+from pathlib import Path
+from typing import Optional
+from taskaway.constants import TASK_DATA_FILES, TASK_DATA_LOCATION_DEFAULT, TASK_DATA_LOCATION_KEY
+
+DataSignature = tuple[Optional[tuple[int, int, int]], ...]
+
+
+def get_data_location(taskrc: Path) -> Path:
+    """Resolves the task warrior data directory, following the same precedence as task warrior itself:
+    the TASKDATA environment variable, then data.location from the taskrc, then the default location
+    """
+    task_data: Optional[str] = os.environ.get("TASKDATA")
+    if task_data:
+        return Path(task_data).expanduser()
+
+    try:
+        with taskrc.expanduser().open("r") as f:
+            for line in f:
+                key, separator, value = line.partition("=")
+                if separator and key.strip() == TASK_DATA_LOCATION_KEY:
+                    return Path(value.split("#")[0].strip()).expanduser()
+    except (FileNotFoundError, IsADirectoryError, PermissionError):
+        pass
+
+    return Path(TASK_DATA_LOCATION_DEFAULT).expanduser()
+
+
+class TaskDataWatcher:
+    """Detects changes to the task warrior data files in one or more data directories by comparing their stat
+    results, so that tasks only need to be exported again when something has actually been written
+    """
+
+    def __init__(self, data_locations: list[Path]) -> None:
+        self.data_locations: list[Path] = data_locations
+        self.data_files: list[Path] = [
+            data_location / data_file for data_location in data_locations for data_file in TASK_DATA_FILES
+        ]
+        self.last_signature: Optional[DataSignature] = None
+
+    @classmethod
+    def from_taskrcs(cls, taskrcs: list[Path]) -> "TaskDataWatcher":
+        return cls(data_locations=[get_data_location(taskrc) for taskrc in taskrcs])
+
+    def get_signature(self) -> DataSignature:
+        signature: list[Optional[tuple[int, int, int]]] = []
+        for data_file in self.data_files:
+            try:
+                stat_result = data_file.stat()
+                signature.append((stat_result.st_mtime_ns, stat_result.st_size, stat_result.st_ino))
+            except OSError:
+                signature.append(None)
+        return tuple(signature)
+
+    def mark_seen(self) -> DataSignature:
+        """Records and returns the current state of the data files, should be called before tasks are exported so
+        writes that race with the export are picked up on the next check
+        """
+        self.last_signature = self.get_signature()
+        return self.last_signature
+
+    @staticmethod
+    def is_detectable(signature: DataSignature) -> bool:
+        """Returns False when none of the data files could be found, so the signature says nothing about the data"""
+        return any(x is not None for x in signature)
+
+    def has_changed(self) -> bool:
+        """Returns True if the data files differ from when mark_seen was last called. When none of the data
+        files can be found changes cannot be detected, so every check reports a change
+        """
+        signature: DataSignature = self.get_signature()
+        if not self.is_detectable(signature):
+            return True
+        return signature != self.last_signature
@@ -0,0 +1,114 @@
+import json
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+from threading import Lock
+from typing import Any, Iterator, Optional
+from taskaway.constants import PERF_PERCENTILES, PERF_SAMPLES
+
+
+def get_percentile(sorted_values: list[float], percentile: float) -> float:
+    """Nearest rank percentile of already sorted values"""
+    index: int = min(len(sorted_values) - 1, max(0, round(percentile / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+class PerfStats:
+    """Phase timers and counters for the hot paths, cheap enough to leave on. Each phase keeps its most recent
+    durations for the percentiles shown by the performance overlay. The phases and counters since the last record
+    are written as a JSON line to the perf log, if there is one, when a record is written. Safe to use from workers
+    """
+
+    def __init__(self, log_path: Optional[Path] = None, samples: int = PERF_SAMPLES) -> None:
+        self.log_path: Optional[Path] = log_path.expanduser() if log_path is not None else None
+        self.samples: int = samples
+        self.lock: Lock = Lock()
+        self.durations: dict[str, deque[float]] = {}
+        self.counters: dict[str, int] = {}
+        # Phase count and total seconds, and counters, since the last record
+        self.record_phases: dict[str, list[float]] = {}
+        self.record_counters: dict[str, int] = {}
+        self.peak_memory: Optional[int] = None
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        start: float = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_duration(name, time.perf_counter() - start)
+
+    def add_duration(self, name: str, seconds: float) -> None:
+        with self.lock:
+            if name not in self.durations:
+                self.durations[name] = deque(maxlen=self.samples)
+            self.durations[name].append(seconds)
+            record_phase: list[float] = self.record_phases.setdefault(name, [0, 0.0])
+            record_phase[0] += 1
+            record_phase[1] += seconds
+
+    def count(self, name: str, amount: int = 1) -> None:
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+            self.record_counters[name] = self.record_counters.get(name, 0) + amount
+
+    def get_percentiles(self) -> dict[str, dict[str, float]]:
+        """Returns the sample count, percentiles and maximum in seconds of the recent durations of each phase"""
+        with self.lock:
+            durations: dict[str, list[float]] = {name: sorted(values) for name, values in self.durations.items()}
+
+        percentiles: dict[str, dict[str, float]] = {}
+        for name, values in sorted(durations.items()):
+            percentiles[name] = {"count": len(values)}
+            for percentile in PERF_PERCENTILES:
+                percentiles[name][f"p{percentile}"] = get_percentile(values, percentile)
+            percentiles[name]["max"] = values[-1]
+        return percentiles
+
+    def get_counters(self) -> dict[str, int]:
+        with self.lock:
+            return dict(sorted(self.counters.items()))
+
+    def start_memory_tracking(self) -> None:
+        """Starts tracemalloc, which slows down allocations, so it is only started when memory is asked for"""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def get_peak_memory(self) -> Optional[int]:
+        """Returns the highest traced memory in bytes since tracking started, or None if it has not"""
+        if not tracemalloc.is_tracing():
+            return self.peak_memory
+        return max(self.peak_memory or 0, tracemalloc.get_traced_memory()[1])
+
+    def write_record(self, kind: str, **fields: Any) -> None:
+        """Ends the current record, appending it to the perf log as a JSON line if there is one"""
+        record_peak_memory: Optional[int] = None
+        if tracemalloc.is_tracing():
+            record_peak_memory = tracemalloc.get_traced_memory()[1]
+            tracemalloc.reset_peak()
+            self.peak_memory = max(self.peak_memory or 0, record_peak_memory)
+
+        with self.lock:
+            record: dict[str, Any] = {
+                "time": time.time(),
+                "kind": kind,
+                **fields,
+                "phases": {
+                    name: {"count": count, "seconds": seconds} for name, (count, seconds) in self.record_phases.items()
+                },
+                "counters": self.record_counters,
+                "peak_memory": record_peak_memory,
+            }
+            self.record_phases = {}
+            self.record_counters = {}
+
+        if self.log_path is None:
+            return
+        try:
+            with self.log_path.open("a") as f:
+                f.write(json.dumps(record) + "\n")
+        except OSError:
+            # The log is diagnostic only, failing to write it should not take the app down
+            pass
@@ -0,0 +1,64 @@
+from typing import Optional
+from taskaway.constants import REFRESH_BACKOFF, REFRESH_MAX_INTERVAL, REFRESH_MIN_INTERVAL
+
+
+class RefreshScheduler:
+    """Decides when the next refresh tick is due. Ticks come every min_interval after user activity or a change to
+    the task data, and the interval grows by backoff on every idle tick up to max_interval. A tick is brought
+    forward to the next time dependent cell deadline, so idle ticks never leave an age or due column out of date.
+    No ticks are due while any pause reason is held, such as the app being suspended
+    """
+
+    def __init__(
+        self,
+        min_interval: float = REFRESH_MIN_INTERVAL,
+        max_interval: float = REFRESH_MAX_INTERVAL,
+        backoff: float = REFRESH_BACKOFF,
+    ) -> None:
+        self.min_interval: float = min_interval
+        self.max_interval: float = max_interval
+        self.backoff: float = backoff
+        self.interval: float = min_interval
+        self.pause_reasons: set[str] = set()
+
+    @property
+    def is_paused(self) -> bool:
+        return bool(self.pause_reasons)
+
+    def record_activity(self) -> bool:
+        """Returns whether the interval was shortened, in which case the pending tick should be rescheduled"""
+        if self.interval == self.min_interval:
+            return False
+        self.interval = self.min_interval
+        return True
+
+    def record_tick(self, changed: bool) -> None:
+        if changed:
+            self.interval = self.min_interval
+        else:
+            self.interval = min(self.interval * self.backoff, self.max_interval)
+
+    def get_delay(self, next_deadline: Optional[float], now: float) -> float:
+        """Returns the seconds until the next tick, next_deadline being the timestamp the next time dependent cell
+        changes at, if there is one
+        """
+        delay: float = self.interval
+        if next_deadline is not None:
+            delay = min(delay, max(next_deadline - now, self.min_interval))
+        return delay
+
+    def pause(self, reason: str) -> None:
+        self.pause_reasons.add(reason)
+
+    def resume(self, reason: str) -> bool:
+        """Returns whether ticks should start again, the interval starts over as a resume is treated as activity"""
+        if reason not in self.pause_reasons:
+            return False
+        self.pause_reasons.discard(reason)
+        self.interval = self.min_interval
+        return not self.pause_reasons
+
+    def describe(self) -> str:
+        if self.pause_reasons:
+            return f"paused while {' and '.join(sorted(self.pause_reasons))}, was every {self.interval:g}s"
+        return f"every {self.interval:g}s"
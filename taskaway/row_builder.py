@@ -0,0 +1,149 @@
+import heapq
+from datetime import datetime
+from typing import Any, Iterable, Optional
+from taskaway.annotation_renderer import AnnotationRenderer
+from taskaway.constants import COL_ANNOTATIONS, COL_URGENCY, TASK_UUID
+from taskaway.task_export import TaskRecord
+from taskaway.taskaway_types import TableRow
+from taskaway.utils import COLUMN_EXTRACTORS, TIME_COLUMN_EXTRACTORS, ColumnExtractor, TimeColumnExtractor
+
+TimeCellKey = tuple[str, str]
+# Stale heap entries are tolerated up to twice the number of cached cells plus this many
+COMPACT_MIN_ENTRIES: int = 1000
+
+
+class TimeColumnCache:
+    """Caches the values of time dependent cells along with the instant each value next changes, so a redraw only
+    has to recompute the cells whose deadline has passed. Cells are also recomputed when the task's dates change, so
+    a new export of a task only costs its time cells when its entry, due or start date has changed. Heap entries of
+    recomputed or forgotten cells are skipped lazily, and dropped all at once when they outnumber the cached cells
+    """
+
+    def __init__(self) -> None:
+        self.cells: dict[TimeCellKey, tuple[Any, float, tuple[Optional[str], ...]]] = {}
+        self.deadlines: list[tuple[float, str, str]] = []
+
+    def get(self, uuid: str, column: str, task: TaskRecord, now: datetime, extractor: TimeColumnExtractor) -> Any:
+        timestamp: float = now.timestamp()
+        dates: tuple[Optional[str], ...] = tuple(task.raw_dates.values())
+        cached: Optional[tuple[Any, float, tuple[Optional[str], ...]]] = self.cells.get((uuid, column))
+        if cached is not None and cached[1] > timestamp and cached[2] == dates:
+            return cached[0]
+
+        value, expiry = extractor(task, now)
+        deadline: float = timestamp + expiry
+        self.cells[(uuid, column)] = (value, deadline, dates)
+        if deadline != float("inf"):
+            heapq.heappush(self.deadlines, (deadline, uuid, column))
+            self.compact()
+        return value
+
+    def compact(self) -> None:
+        """Rebuilds the heap from the cached cells once most of its entries are stale"""
+        if len(self.deadlines) <= 2 * len(self.cells) + COMPACT_MIN_ENTRIES:
+            return
+        self.deadlines = [
+            (deadline, uuid, column)
+            for (uuid, column), (_, deadline, _) in self.cells.items()
+            if deadline != float("inf")
+        ]
+        heapq.heapify(self.deadlines)
+
+    def get_next_deadline(self) -> Optional[float]:
+        """Returns the timestamp the next cached cell may change at, possibly early as forgotten cells are skipped
+        lazily
+        """
+        return self.deadlines[0][0] if self.deadlines else None
+
+    def pop_expired(self, now: datetime) -> list[TimeCellKey]:
+        """Removes and returns the cells whose values may have changed by now"""
+        timestamp: float = now.timestamp()
+        expired: list[TimeCellKey] = []
+        while self.deadlines and self.deadlines[0][0] <= timestamp:
+            deadline, uuid, column = heapq.heappop(self.deadlines)
+            cached: Optional[tuple[Any, float, tuple[Optional[str], ...]]] = self.cells.get((uuid, column))
+            # Entries are left in the heap when a cell is recomputed or forgotten, skip those
+            if cached is None or cached[1] != deadline:
+                continue
+            del self.cells[(uuid, column)]
+            expired.append((uuid, column))
+        return expired
+
+    def forget(self, uuid: str) -> None:
+        for column in TIME_COLUMN_EXTRACTORS:
+            self.cells.pop((uuid, column), None)
+        self.compact()
+
+
+class RowBuilder:
+    """Builds table rows for tasks using the column extractors resolved once for a list of columns. The cells that
+    do not depend on the current time are memoized per task, and only rebuilt when the task's modified time changes.
+    Urgency is recalculated by every export without changing the modified time, so its cell is filled in on every
+    build. The annotations column, which sets the row height, is rendered by annotation_renderer
+    """
+
+    def __init__(self, columns: list[str], annotation_renderer: AnnotationRenderer) -> None:
+        self.columns: list[str] = columns
+        self.annotation_renderer: AnnotationRenderer = annotation_renderer
+        self.static_extractors: list[tuple[int, ColumnExtractor]] = []
+        self.time_extractors: list[tuple[int, str, TimeColumnExtractor]] = []
+        for index, column in enumerate(columns):
+            if column in (COL_ANNOTATIONS, COL_URGENCY):
+                continue
+            elif column in TIME_COLUMN_EXTRACTORS:
+                self.time_extractors.append((index, column, TIME_COLUMN_EXTRACTORS[column]))
+            elif column in COLUMN_EXTRACTORS:
+                self.static_extractors.append((index, COLUMN_EXTRACTORS[column]))
+            else:
+                raise RuntimeError(f"unsupported column name {column}")
+        self.column_indexes: dict[str, int] = {column: index for index, column in enumerate(columns)}
+        self.annotations_index: Optional[int] = columns.index(COL_ANNOTATIONS) if COL_ANNOTATIONS in columns else None
+        self.urgency_index: Optional[int] = columns.index(COL_URGENCY) if COL_URGENCY in columns else None
+        self.memo: dict[str, tuple[str, list[Any], int]] = {}
+        self.time_cache: TimeColumnCache = TimeColumnCache()
+        # Rows whose static cells have been built rather than taken from the memo
+        self.rows_built: int = 0
+
+    def get_static_cells(self, task: TaskRecord, now: datetime) -> tuple[list[Any], int]:
+        uuid: str = task[TASK_UUID]
+        memoized = self.memo.get(uuid)
+        if memoized is not None and memoized[0] == task.modified:
+            return memoized[1], memoized[2]
+
+        cells: list[Any] = [None] * len(self.columns)
+        for index, extractor in self.static_extractors:
+            cells[index] = extractor(task, now)
+
+        self.rows_built += 1
+        height: int = 1
+        if self.annotations_index is not None:
+            cells[self.annotations_index], height = self.annotation_renderer.render(task)
+
+        # Local copies have no modified time, and are rebuilt on every redraw until the next export replaces them
+        if task.modified is not None:
+            self.memo[uuid] = (task.modified, cells, height)
+        return cells, height
+
+    def build(self, task: TaskRecord, now: datetime) -> TableRow:
+        static_cells, height = self.get_static_cells(task, now)
+        cells: list[Any] = list(static_cells)
+        if self.urgency_index is not None:
+            cells[self.urgency_index] = task.urgency
+        uuid: str = task[TASK_UUID]
+        for index, column, extractor in self.time_extractors:
+            cells[index] = self.time_cache.get(uuid, column, task, now, extractor)
+        return (cells, height)
+
+    def get_time_cell(self, task: TaskRecord, column: str, now: datetime) -> Any:
+        return self.time_cache.get(task[TASK_UUID], column, task, now, TIME_COLUMN_EXTRACTORS[column])
+
+    def forget(self, uuids: Iterable[str]) -> None:
+        """Drops the memoized cells of tasks whose rows change without their modified time changing"""
+        for uuid in uuids:
+            self.memo.pop(uuid, None)
+
+    def remove(self, uuids: Iterable[str]) -> None:
+        """Drops everything cached for tasks that are gone"""
+        for uuid in uuids:
+            self.memo.pop(uuid, None)
+            self.time_cache.forget(uuid)
@@ -0,0 +1,70 @@
+from bisect import bisect_left, insort
+from typing import Any, Optional
+from taskaway.row_sort import RowSorter, RowSortKey
+from taskaway.taskaway_types import ColumnSchema, TableRow
+
+
+class RowModel:
+    """All rows of the current view in display order. The task table only holds the window of these rows around the
+    cursor, so positions in the model rather than in the table are what navigation and selection work with. The
+    order is kept as a sorted list of row sort keys that is updated with bisect as rows change
+    """
+
+    # Above this fraction of changed rows it is cheaper to sort again than to insert each change
+    RESORT_FRACTION: float = 0.25
+
+    def __init__(self, row_sorter: RowSorter, column_schema: ColumnSchema) -> None:
+        self.row_sorter: RowSorter = row_sorter
+        self.column_schema: ColumnSchema = column_schema
+        self.rows: dict[str, TableRow] = {}
+        self.sort_keys: dict[str, RowSortKey] = {}
+        self.sorted_keys: list[RowSortKey] = []
+
+    def __len__(self) -> int:
+        return len(self.sorted_keys)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.sort_keys
+
+    def update(self, rows: dict[str, TableRow], sort_keys: dict[str, RowSortKey], column_schema: ColumnSchema) -> None:
+        """Replaces the rows, only moving the rows whose sort key has changed"""
+        self.rows = rows
+        self.column_schema = column_schema
+
+        removed: list[RowSortKey] = [sort_key for key, sort_key in self.sort_keys.items() if key not in sort_keys]
+        changed: list[tuple[Optional[RowSortKey], RowSortKey]] = [
+            (self.sort_keys.get(key), sort_key)
+            for key, sort_key in sort_keys.items()
+            if self.sort_keys.get(key) != sort_key
+        ]
+        self.sort_keys = sort_keys
+
+        if len(removed) + len(changed) > len(self.sorted_keys) * self.RESORT_FRACTION:
+            self.sorted_keys = sorted(sort_keys.values())
+            return
+
+        for sort_key in removed:
+            self.remove_sort_key(sort_key)
+        for previous_sort_key, sort_key in changed:
+            if previous_sort_key is not None:
+                self.remove_sort_key(previous_sort_key)
+            insort(self.sorted_keys, sort_key)
+
+    def remove_sort_key(self, sort_key: RowSortKey) -> None:
+        del self.sorted_keys[bisect_left(self.sorted_keys, sort_key)]
+
+    def get_index(self, key: str) -> Optional[int]:
+        sort_key: Optional[RowSortKey] = self.sort_keys.get(key)
+        if sort_key is None:
+            return None
+        return bisect_left(self.sorted_keys, sort_key)
+
+    def get_keys(self, start: int, end: int) -> list[str]:
+        return [sort_key[-1] for sort_key in self.sorted_keys[start:end]]
+
+    def get_cell(self, key: str, column: str) -> Any:
+        return self.rows[key][0][self.column_schema.column_indexes[column]]
+
+    def get_window(self, start: int, size: int) -> dict[str, TableRow]:
+        end: int = start + size
+        return {key: self.rows[key] for key in self.get_keys(start, end)}
@@ -0,0 +1,119 @@
+from datetime import datetime
+from typing import Any, Callable, Iterable, Optional
+from taskaway.constants import (
+    SORT_AGE,
+    SORT_DESCRIPTION,
+    SORT_DUE,
+    SORT_FIELDS,
+    SORT_PROJECT,
+    SORT_URGENCY,
+    TASK_DUE,
+    TASK_ENTRY,
+    TASK_STARTED,
+)
+from taskaway.task_export import TaskRecord
+
+# Sort keys always end with the row key, so they are unique and the row key can be read back from them
+RowSortKey = tuple[Any, ...]
+SortOrder = list[tuple[str, bool]]
+
+
+def parse_sort_order(sort_order: str) -> SortOrder:
+    """Parses a sort order such as 'urgency-,due+' into (field, descending) pairs. Raises ValueError if the sort
+    order is not valid
+    """
+    fields: SortOrder = []
+    for part in sort_order.split(","):
+        part = part.strip()
+        if not part:
+            continue
+
+        field: str = part.rstrip("+-")
+        if field not in SORT_FIELDS:
+            raise ValueError(f"Unknown sort field '{field}', expected one of {', '.join(SORT_FIELDS)}")
+        if part.removeprefix(field) not in ("", "+", "-"):
+            raise ValueError(f"Invalid sort direction in '{part}', expected + or -")
+        fields.append((field, part.endswith("-")))
+    return fields
+
+
+class _Reversed:
+    """Wraps a value so it sorts in the reverse order, used for descending sorts on values that can not be negated"""
+
+    __slots__ = ("value",)
+
+    def __init__(self, value: Any) -> None:
+        self.value: Any = value
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, _Reversed) and self.value == other.value
+
+    def __lt__(self, other: "_Reversed") -> bool:
+        return other.value < self.value
+
+
+def get_timestamp(value: Optional[datetime]) -> Optional[float]:
+    return value.timestamp() if value else None
+
+
+def get_age_sort_value(task: TaskRecord) -> Optional[float]:
+    # Youngest first, that is the most recent entry
+    entry: Optional[float] = get_timestamp(task[TASK_ENTRY])
+    return -entry if entry is not None else None
+
+
+SORT_FIELD_VALUES: dict[str, Callable[[TaskRecord], Any]] = {
+    SORT_URGENCY: lambda task: task.urgency,
+    SORT_DUE: lambda task: get_timestamp(task[TASK_DUE]),
+    SORT_AGE: get_age_sort_value,
+    SORT_PROJECT: lambda task: task.project or "",
+    SORT_DESCRIPTION: lambda task: task.description,
+}
+
+
+class RowSorter:
+    """Computes row sort keys for a sort order. Active tasks come first, most recently started first, then each
+    project's row followed by its tasks, so the project tree stays grouped. The sort order orders the active tasks
+    and the tasks within each project. Task keys are memoized per task until the task is modified
+    """
+
+    def __init__(self, sort_order: str) -> None:
+        self.sort_order: str = sort_order
+        self.fields: list[tuple[Callable[[TaskRecord], Any], bool]] = [
+            (SORT_FIELD_VALUES[field], descending) for field, descending in parse_sort_order(sort_order)
+        ]
+        self.memo: dict[str, tuple[tuple[Any, Any], RowSortKey]] = {}
+
+    def get_field_keys(self, task: TaskRecord) -> list[Any]:
+        keys: list[Any] = []
+        for get_value, descending in self.fields:
+            value: Any = get_value(task)
+            if value is None:
+                # Missing values sort last in either direction
+                keys.append((1, 0))
+            elif not descending:
+                keys.append((0, value))
+            elif isinstance(value, (int, float)):
+                keys.append((0, -value))
+            else:
+                keys.append((0, _Reversed(value)))
+        return keys
+
+    def get_task_key(self, task: TaskRecord) -> RowSortKey:
+        memoized = self.memo.get(task.uuid)
+        if memoized is not None and memoized[0] == task.version:
+            return memoized[1]
+
+        started: Optional[float] = get_timestamp(task[TASK_STARTED])
+        group: tuple[Any, ...] = (0, -started, "") if started is not None else (1, 0, task.project or "")
+        key: RowSortKey = (*group, 1, *self.get_field_keys(task), task.uuid)
+        self.memo[task.uuid] = (task.version, key)
+        return key
+
+    @staticmethod
+    def get_project_key(project: str) -> RowSortKey:
+        return (1, 0, project, 0, project)
+
+    def forget(self, uuids: Iterable[str]) -> None:
+        for uuid in uuids:
+            self.memo.pop(uuid, None)
@@ -0,0 +1,218 @@
+from textual.app import ComposeResult
+from textual.containers import Grid
+from textual.widgets import DataTable, Input, Label, Pretty
+from textual.binding import Binding, BindingType
+from textual.screen import ModalScreen
+from typing import Callable, ClassVar, Optional
+from taskaway.constants import HELP_TABLE_ID, PERF_PERCENTILES, PERF_TABLE_ID
+from taskaway.perf import PerfStats
+from taskaway.taskaway_types import TaskAwayBinding
+
+
+class ErrorMessageScreen(ModalScreen):
+    def __init__(self, error_msg: str) -> None:
+        self.error_msg: str = error_msg
+        super().__init__()
+
+    def compose(self) -> ComposeResult:
+        yield Grid(
+            Pretty(self.error_msg),
+            Label("Press any key to continue...", id="error_message"),
+        )
+
+    def on_key(self) -> None:
+        self.dismiss()
+
+
+class ConfirmationScreen(ModalScreen[bool]):
+    BINDINGS: ClassVar[list[BindingType]] = [
+        Binding("escape", "return", "Exit without any action", show=True),
+    ]
+
+    def __init__(self, confirmation_question: str) -> None:
+        self.confirmation_question: str = confirmation_question
+        super().__init__()
+
+    def compose(self) -> ComposeResult:
+        yield Grid(
+            Label(self.confirmation_question, id="command"),
+            Input(placeholder="y/n", restrict=r"[yn]", id="input"),
+            id="dialog",
+        )
+
+    def on_input_changed(self, event: Input.Changed) -> None:
+        input_result: str = self.query_one("#input").value
+        if input_result == "y":
+            self.dismiss(True)
+        elif input_result == "n":
+            self.dismiss(False)
+
+        self.dismiss(False)
+
+    def action_return(self) -> None:
+        self.dismiss("")
+
+
+class InputCommandScreen(ModalScreen):
+    BINDINGS: ClassVar[list[BindingType]] = [
+        Binding("escape", "return", "Exit without any action", show=True),
+    ]
+
+    def __init__(self, command: str, default_text: str, placeholder_text: str) -> None:
+        self.command: str = command
+        self.default_text: str = default_text
+        self.placeholder_text: str = placeholder_text
+        super().__init__()
+
+    def compose(self) -> ComposeResult:
+        yield Grid(
+            Label(self.command, id="command"),
+            Input(value=self.default_text, placeholder=self.placeholder_text, select_on_focus=False, id="input"),
+            id="dialog",
+        )
+
+    def on_mount(self) -> None:
+        self.query_one("#input").action_cursor_right()
+
+    def action_return(self) -> None:
+        self.dismiss("")
+
+    def on_input_submitted(self) -> None:
+        description_input: str = self.query_one("#input").value
+        self.dismiss(description_input)
+
+
+class SearchScreen(ModalScreen[Optional[str]]):
+    """Search input that calls on_search with the search on every change, so the table filters as it is typed.
+    Enter keeps the search, escape dismisses with None to clear it
+    """
+
+    BINDINGS: ClassVar[list[BindingType]] = [
+        Binding("escape", "return", "Exit and clear the search", show=True),
+    ]
+
+    def __init__(self, search: str, on_search: Callable[[str], None]) -> None:
+        self.search: str = search
+        self.on_search: Callable[[str], None] = on_search
+        super().__init__()
+
+    def compose(self) -> ComposeResult:
+        yield Grid(
+            Label("Search", id="command"),
+            Input(
+                value=self.search,
+                placeholder="words in descriptions, tags and annotations",
+                select_on_focus=False,
+                id="input",
+            ),
+            id="dialog",
+        )
+
+    def on_mount(self) -> None:
+        self.query_one("#input", Input).action_end()
+
+    def on_input_changed(self, event: Input.Changed) -> None:
+        self.on_search(event.value)
+
+    def action_return(self) -> None:
+        self.dismiss(None)
+
+    def on_input_submitted(self, event: Input.Submitted) -> None:
+        self.dismiss(event.value)
+
+
+class HelpScreen(ModalScreen):
+    BINDINGS: ClassVar[list[BindingType]] = [
+        Binding("escape", "return", "Exit help screen", show=False),
+        Binding("h", "return", "Exit help screen", show=False),
+        Binding("q", "retun", "Quit and save"),
+        Binding("j", "cursor_down", "Cursor down"),
+        Binding("k", "cursor_up", "Cursor up"),
+    ]
+
+    def __init__(self, help_commands: list[TaskAwayBinding]) -> None:
+        self.help_commands: list[TaskAwayBinding] = help_commands
+        super().__init__()
+
+    def compose(self) -> ComposeResult:
+        yield Grid(DataTable(id=HELP_TABLE_ID))
+
+    def on_mount(self) -> None:
+        table = self.query_one(DataTable)
+        table.add_column("Category", key="category")
+        table.add_column("Command", key="command")
+        table.add_column("Description", key="description")
+        for help_command in self.help_commands:
+            table.add_row(help_command.category, help_command.key, help_command.description)
+
+        table.cursor_type = "row"
+        table.zebra_stripes = True
+
+    def get_table(self) -> DataTable:
+        return self.query_one(f"#{HELP_TABLE_ID}")
+
+    def action_return(self) -> None:
+        self.dismiss()
+
+    def action_cursor_down(self) -> None:
+        table = self.get_table()
+        table.action_cursor_down()
+
+    def action_cursor_up(self) -> None:
+        table = self.get_table()
+        table.action_cursor_up()
+
+
+class PerfScreen(ModalScreen):
+    """Shows the recent percentiles of each timed phase, the counters, the peak traced memory and any status lines
+    from get_status, updated every second while open
+    """
+
+    BINDINGS: ClassVar[list[BindingType]] = [
+        Binding("escape", "return", "Exit performance overlay", show=False),
+        Binding("f2", "return", "Exit performance overlay", show=False),
+    ]
+
+    def __init__(self, perf: PerfStats, get_status: Optional[Callable[[], dict[str, str]]] = None) -> None:
+        self.perf: PerfStats = perf
+        self.get_status: Optional[Callable[[], dict[str, str]]] = get_status
+        super().__init__()
+
+    def compose(self) -> ComposeResult:
+        yield Grid(DataTable(id=PERF_TABLE_ID))
+
+    def on_mount(self) -> None:
+        table = self.get_table()
+        table.add_column("Phase", key="phase")
+        table.add_column("Count", key="count")
+        for percentile in PERF_PERCENTILES:
+            table.add_column(f"p{percentile} ms", key=f"p{percentile}")
+        table.add_column("Max ms", key="max")
+        table.cursor_type = "row"
+        table.zebra_stripes = True
+        self.update_stats()
+        self.set_interval(1.0, self.update_stats)
+
+    def update_stats(self) -> None:
+        table = self.get_table()
+        table.clear()
+        empty: list[str] = [""] * (len(PERF_PERCENTILES) + 1)
+        for phase, stats in self.perf.get_percentiles().items():
+            durations: list[str] = [f"{stats[f'p{percentile}'] * 1000:.1f}" for percentile in PERF_PERCENTILES]
+            table.add_row(phase, int(stats["count"]), *durations, f"{stats['max'] * 1000:.1f}")
+        for counter, value in self.perf.get_counters().items():
+            table.add_row(counter, value, *empty)
+
+        peak_memory: Optional[int] = self.perf.get_peak_memory()
+        if peak_memory is not None:
+            table.add_row("peak memory MiB", f"{peak_memory / 2**20:.1f}", *empty)
+
+        if self.get_status is not None:
+            for name, status in self.get_status().items():
+                table.add_row(name, status, *empty)
+
+    def get_table(self) -> DataTable:
+        return self.query_one(f"#{PERF_TABLE_ID}", DataTable)
+
+    def action_return(self) -> None:
+        self.dismiss()
@@ -0,0 +1,77 @@
+import re
+from typing import Optional
+from taskaway.task_export import TaskRecord
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def get_tokens(text: str) -> set[str]:
+    return set(TOKEN_PATTERN.findall(text.lower()))
+
+
+def get_task_tokens(task: TaskRecord) -> set[str]:
+    """Returns the word tokens of the task's description, tags and annotations"""
+    texts: list[str] = [task.description, *task.tags]
+    texts += [annotation.get("description", "") for annotation in task.raw_annotations]
+    return get_tokens(" ".join(texts))
+
+
+class SearchIndex:
+    """Inverted index from the lower case word tokens of task descriptions, tags and annotations to task uuids,
+    updated as tasks are added and removed. A query matches the tasks that have, for every word in the query, a
+    token containing that word. Searching scans the vocabulary rather than the tasks, and the tokens matched by the
+    previous query are reused while a word is being typed, as a longer word can only match fewer tokens
+    """
+
+    def __init__(self) -> None:
+        self.tokens: dict[str, set[str]] = {}
+        self.task_tokens: dict[str, set[str]] = {}
+        # Tokens containing each word of the last query, only valid until the vocabulary changes
+        self.matched_tokens: dict[str, list[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self.task_tokens)
+
+    def add(self, task: TaskRecord) -> None:
+        self.remove(task.uuid)
+        tokens: set[str] = get_task_tokens(task)
+        self.task_tokens[task.uuid] = tokens
+        for token in tokens:
+            uuids: Optional[set[str]] = self.tokens.get(token)
+            if uuids is None:
+                self.tokens[token] = {task.uuid}
+                self.matched_tokens = {}
+            else:
+                uuids.add(task.uuid)
+
+    def remove(self, uuid: str) -> None:
+        for token in self.task_tokens.pop(uuid, set()):
+            uuids: set[str] = self.tokens[token]
+            uuids.discard(uuid)
+            if not uuids:
+                del self.tokens[token]
+                self.matched_tokens = {}
+
+    def get_matching_tokens(self, word: str) -> list[str]:
+        candidates: Optional[list[str]] = None
+        for previous_word, previous_tokens in self.matched_tokens.items():
+            if previous_word in word and (candidates is None or len(previous_tokens) < len(candidates)):
+                candidates = previous_tokens
+        return [token for token in (self.tokens if candidates is None else candidates) if word in token]
+
+    def search(self, query: str) -> set[str]:
+        """Returns the uuids of the tasks matching every word of the query"""
+        words: list[str] = sorted(TOKEN_PATTERN.findall(query.lower()), key=len, reverse=True)
+        matched_tokens: dict[str, list[str]] = {}
+        result: Optional[set[str]] = None
+        for word in words:
+            matched_tokens[word] = self.get_matching_tokens(word)
+            uuids: set[str] = set()
+            for token in matched_tokens[word]:
+                uuids |= self.tokens[token]
+            result = uuids if result is None else result & uuids
+            if not result:
+                break
+
+        self.matched_tokens = matched_tokens
+        return result if result is not None else set(self.task_tokens)
@@ -0,0 +1,99 @@
+import json
+import os
+from pathlib import Path
+from typing import Any, Optional
+from taskaway.constants import SNAPSHOT_CACHE_SUFFIX, SNAPSHOT_CACHE_VERSION
+from taskaway.data_watcher import DataSignature, TaskDataWatcher
+from taskaway.task_export import TaskRecord
+
+
+def get_snapshot_cache_path(taskaway_config: Path) -> Path:
+    """Returns the snapshot cache path next to the taskaway config, e.g. ~/.taskaway.cache.json"""
+    taskaway_config = taskaway_config.expanduser()
+    return taskaway_config.with_name(taskaway_config.stem + SNAPSHOT_CACHE_SUFFIX)
+
+
+def to_signature(data: Any) -> DataSignature:
+    return tuple(tuple(x) if x is not None else None for x in data)
+
+
+class CachedSnapshot:
+    """The tasks and view state read from the snapshot cache. It is stale if the data files have changed since the
+    tasks were exported, or if that can not be told
+    """
+
+    def __init__(
+        self,
+        tasks: list[TaskRecord],
+        signature: DataSignature,
+        project_filter: str,
+        tag_filter: list[str],
+        expanded_projects: set[str],
+    ) -> None:
+        self.tasks: list[TaskRecord] = tasks
+        self.signature: DataSignature = signature
+        self.project_filter: str = project_filter
+        self.tag_filter: list[str] = tag_filter
+        self.expanded_projects: set[str] = expanded_projects
+
+    def is_stale(self, data_watcher: TaskDataWatcher) -> bool:
+        signature: DataSignature = data_watcher.get_signature()
+        return not data_watcher.is_detectable(signature) or signature != self.signature
+
+    def __repr__(self):
+        return f"CachedSnapshot(tasks={len(self.tasks)}, project_filter={self.project_filter})"
+
+
+class SnapshotCache:
+    """Persists the last exported tasks and the view they were shown in, so taskaway can show them on start up while
+    the first export runs. The cache is keyed to the data locations and the data files' signature
+    """
+
+    def __init__(self, cache_path: Path, data_locations: list[Path]) -> None:
+        self.cache_path: Path = cache_path
+        self.data_locations: list[str] = [str(data_location) for data_location in data_locations]
+
+    def load(self) -> Optional[CachedSnapshot]:
+        """Returns the cached snapshot, or None if there is no usable cache for the data locations"""
+        try:
+            with self.cache_path.open("r") as f:
+                data = json.load(f)
+            if data["version"] != SNAPSHOT_CACHE_VERSION or data["data_locations"] != self.data_locations:
+                return None
+
+            return CachedSnapshot(
+                tasks=[TaskRecord(task) for task in data["tasks"]],
+                signature=to_signature(data["signature"]),
+                project_filter=data["project_filter"],
+                tag_filter=data["tag_filter"],
+                expanded_projects=set(data["expanded_projects"]),
+            )
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def save(
+        self,
+        tasks: list[TaskRecord],
+        signature: DataSignature,
+        project_filter: str,
+        tag_filter: list[str],
+        expanded_projects: set[str],
+    ) -> None:
+        data = {
+            "version": SNAPSHOT_CACHE_VERSION,
+            "data_locations": self.data_locations,
+            "signature": signature,
+            "project_filter": project_filter,
+            "tag_filter": tag_filter,
+            "expanded_projects": sorted(expanded_projects),
+            "tasks": [task.to_dict() for task in tasks],
+        }
+
+        # Written to a temporary file first so a partly written cache is never read
+        tmp_path: Path = self.cache_path.with_name(f"{self.cache_path.name}.{os.getpid()}.tmp")
+        try:
+            with tmp_path.open("w") as f:
+                json.dump(data, f, separators=(",", ":"))
+            os.replace(tmp_path, self.cache_path)
+        except OSError:
+            tmp_path.unlink(missing_ok=True)
@@ -0,0 +1,35 @@
+import time
+from typing import Optional
+
+
+class StartupTrace:
+    """Records how long each stage of start up took, measured from when the entry point started. Kept free of
+    imports beyond the standard library so it can be created before anything heavy is imported
+    """
+
+    def __init__(self) -> None:
+        self.start: float = time.perf_counter()
+        self.stages: list[tuple[str, float]] = []
+
+    def mark(self, stage: str) -> None:
+        """Records the time a stage finished, only the first time it is marked"""
+        if not self.has_marked(stage):
+            self.stages.append((stage, time.perf_counter()))
+
+    def has_marked(self, stage: str) -> bool:
+        return any(name == stage for name, _ in self.stages)
+
+    def report(self) -> str:
+        lines: list[str] = ["taskaway startup trace"]
+        previous: float = self.start
+        for stage, finished in self.stages:
+            lines.append(
+                f"  {stage:<24} {(finished - self.start) * 1000:8.1f} ms  (+{(finished - previous) * 1000:.1f} ms)"
+            )
+            previous = finished
+        return "\n".join(lines)
+
+
+def mark_stage(startup_trace: Optional[StartupTrace], stage: str) -> None:
+    if startup_trace is not None:
+        startup_trace.mark(stage)
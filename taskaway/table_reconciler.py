@@ -0,0 +1,39 @@
+from typing import Any
+from textual.widgets import DataTable
+from textual.widgets._data_table import ColumnKey, RowKey
+from taskaway.taskaway_types import TableRow
+
+
+def reconcile_rows(table: DataTable, columns: list[str], rows: dict[str, TableRow]) -> int:
+    """Updates the table in place so it holds exactly the given rows, where rows maps a row key to its cells (in
+    the order of columns) and height. Only rows and cells that differ are touched, leaving the cursor and scroll
+    position alone. New rows are added at the end, ordering the rows is left to the caller. Returns the number of
+    cells written
+    """
+    column_keys: list[ColumnKey] = [ColumnKey(column) for column in columns]
+    cells_written: int = 0
+
+    for row_key in [row_key for row_key in table.rows if row_key.value not in rows]:
+        table.remove_row(row_key)
+
+    for key, (cells, height) in rows.items():
+        row_key = RowKey(key)
+        if row_key not in table.rows:
+            table.add_row(*cells, height=height, key=key)
+            cells_written += len(cells)
+            continue
+
+        if table.rows[row_key].height != height:
+            table.remove_row(row_key)
+            table.add_row(*cells, height=height, key=key)
+            cells_written += len(cells)
+            continue
+
+        current_cells: list[Any] = table.get_row(row_key)
+        for column_key, current_value, value in zip(column_keys, current_cells, cells):
+            if current_value == value:
+                continue
+            table.update_cell(row_key, column_key, value, update_width=True)
+            cells_written += 1
+
+    return cells_written
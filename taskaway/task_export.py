@@ -0,0 +1,304 @@
+import json
+import os
+import subprocess
+import tempfile
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from threading import Lock
+from typing import IO, Any, Iterator, Optional
+from taskaway.constants import (
+    TASK_ANNOTATIONS,
+    TASK_DESCRIPTION,
+    TASK_DUE,
+    TASK_ENTRY,
+    TASK_MODIFIED,
+    TASK_PROJECT,
+    TASK_STARTED,
+    TASK_STATUS,
+    TASK_TAGS,
+    TASK_URGENCY,
+    TASK_UUID,
+)
+
+EXPORT_OVERRIDES = [
+    "rc.json.array=off",
+    "rc.verbose=nothing",
+    "rc.confirmation=no",
+]
+
+
+class TaskExportError(Exception):
+    pass
+
+
+class TaskExportCancelled(TaskExportError):
+    """Raised by an export whose process was killed by TaskExporter.cancel"""
+
+
+def parse_task_date(value: Optional[str]) -> Optional[datetime]:
+    """Parses a task warrior export date, e.g. '20250101T093000Z'"""
+    if not value:
+        return None
+    return datetime(
+        int(value[0:4]),
+        int(value[4:6]),
+        int(value[6:8]),
+        int(value[9:11]),
+        int(value[11:13]),
+        int(value[13:15]),
+        tzinfo=timezone.utc,
+    )
+
+
+def format_task_date(value: datetime) -> str:
+    return value.astimezone(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+def get_taskrc_location(taskrc: Path) -> str:
+    """Returns the TASKRC value for the taskrc path. Matches tasklib, a missing taskrc is replaced with / so task uses
+    its defaults instead of creating one
+    """
+    taskrc = taskrc.expanduser()
+    return str(taskrc) if taskrc.exists() else "/"
+
+
+def get_tree_project(source: Optional[str], project: Optional[str]) -> Optional[str]:
+    """Returns the project a task is shown under. Tasks from one of several sources are shown under a top level
+    project named after their source, source is None when there is only one
+    """
+    if source is None:
+        return project
+    return f"{source}.{project}" if project else source
+
+
+class TaskRecord:
+    """A task loaded from task export. Only the fields taskaway displays are kept and dates are parsed the first
+    time they are read. Fields are read with the same task[field] syntax as a tasklib Task. Records in a TaskStore
+    are never changed in place, local changes are made to a copy. When several sources are loaded, source names the
+    one the task was exported from and project includes it, see get_tree_project
+    """
+
+    __slots__ = (
+        "uuid",
+        "description",
+        "project",
+        "tags",
+        "urgency",
+        "status",
+        "modified",
+        "raw_dates",
+        "dates",
+        "raw_annotations",
+        "annotations",
+        "source",
+    )
+
+    def __init__(self, data: dict[str, Any]) -> None:
+        self.uuid: str = data[TASK_UUID]
+        self.description: str = data.get(TASK_DESCRIPTION, "")
+        self.project: Optional[str] = data.get(TASK_PROJECT)
+        self.tags: list[str] = data.get(TASK_TAGS, [])
+        self.urgency: float = data.get(TASK_URGENCY, 0.0)
+        self.status: str = data.get(TASK_STATUS, "")
+        self.modified: Optional[str] = data.get(TASK_MODIFIED)
+        self.raw_dates: dict[str, Optional[str]] = {
+            TASK_ENTRY: data.get(TASK_ENTRY),
+            TASK_DUE: data.get(TASK_DUE),
+            TASK_STARTED: data.get(TASK_STARTED),
+        }
+        self.dates: dict[str, Optional[datetime]] = {}
+        self.raw_annotations: list[dict[str, str]] = data.get(TASK_ANNOTATIONS, [])
+        self.annotations: Optional[list[dict[str, Any]]] = None
+        self.source: Optional[str] = None
+
+    @property
+    def version(self) -> tuple[Optional[str], float]:
+        """Changes whenever the displayed task changes, urgency is included as it is recalculated on every export"""
+        return (self.modified, self.urgency)
+
+    @property
+    def active(self) -> bool:
+        return self.raw_dates[TASK_STARTED] is not None
+
+    def get_date(self, field: str) -> Optional[datetime]:
+        if field not in self.dates:
+            self.dates[field] = parse_task_date(self.raw_dates[field])
+        return self.dates[field]
+
+    def get_annotations(self) -> list[dict[str, Any]]:
+        if self.annotations is None:
+            self.annotations = [
+                {"entry": parse_task_date(x.get("entry")), "description": x.get("description", "")}
+                for x in self.raw_annotations
+            ]
+        return self.annotations
+
+    def copy(self) -> "TaskRecord":
+        """Returns a copy to apply local changes to. The copy has no modified time, so it is always replaced by the
+        next export of the task
+        """
+        record: TaskRecord = TaskRecord.__new__(TaskRecord)
+        record.uuid = self.uuid
+        record.description = self.description
+        record.project = self.project
+        record.tags = list(self.tags)
+        record.urgency = self.urgency
+        record.status = self.status
+        record.modified = None
+        record.raw_dates = dict(self.raw_dates)
+        record.dates = dict(self.dates)
+        record.raw_annotations = list(self.raw_annotations)
+        record.annotations = None
+        record.source = self.source
+        return record
+
+    def set_started(self, started: Optional[datetime]) -> None:
+        self.raw_dates[TASK_STARTED] = format_task_date(started) if started else None
+        self.dates.pop(TASK_STARTED, None)
+
+    def add_annotation(self, description: str, entry: datetime) -> None:
+        self.raw_annotations.append({"entry": format_task_date(entry), "description": description})
+        self.annotations = None
+
+    def apply_modify_arguments(self, args: list[str]) -> None:
+        """Applies the parts of task modify arguments that can be predicted locally, project:x, +tag and -tag.
+        Anything else is left for the next export to pick up
+        """
+        for arg in args:
+            if arg.startswith(f"{TASK_PROJECT}:"):
+                self.project = get_tree_project(self.source, arg.split(":", 1)[1] or None)
+            elif arg.startswith("+") and len(arg) > 1 and arg[1:] not in self.tags:
+                self.tags = self.tags + [arg[1:]]
+            elif arg.startswith("-") and len(arg) > 1:
+                self.tags = [tag for tag in self.tags if tag != arg[1:]]
+
+    def to_dict(self) -> dict[str, Any]:
+        """Returns the task in task export form, so it can be read back with TaskRecord(data)"""
+        data: dict[str, Any] = {
+            TASK_UUID: self.uuid,
+            TASK_DESCRIPTION: self.description,
+            TASK_STATUS: self.status,
+            TASK_URGENCY: self.urgency,
+        }
+        if self.project is not None:
+            data[TASK_PROJECT] = self.project
+        if self.tags:
+            data[TASK_TAGS] = self.tags
+        if self.modified is not None:
+            data[TASK_MODIFIED] = self.modified
+        data |= {field: value for field, value in self.raw_dates.items() if value is not None}
+        if self.raw_annotations:
+            data[TASK_ANNOTATIONS] = self.raw_annotations
+        return data
+
+    def __getitem__(self, field: str) -> Any:
+        if field in self.raw_dates:
+            return self.get_date(field)
+        elif field == TASK_ANNOTATIONS:
+            return self.get_annotations()
+        elif field == TASK_UUID:
+            return self.uuid
+        elif field == TASK_DESCRIPTION:
+            return self.description
+        elif field == TASK_PROJECT:
+            return self.project
+        elif field == TASK_TAGS:
+            return self.tags
+        elif field == TASK_URGENCY:
+            return self.urgency
+        elif field == TASK_STATUS:
+            return self.status
+        elif field == TASK_MODIFIED:
+            return parse_task_date(self.modified)
+        raise KeyError(field)
+
+    def __repr__(self):
+        return f"TaskRecord(uuid={self.uuid}, description={self.description})"
+
+
+class TaskExporter:
+    """Runs task export with the configured task command and taskrc, streaming the output into TaskRecords. Running
+    exports can be killed from another thread with cancel, which makes them, and any started before reset_cancel,
+    raise TaskExportCancelled
+    """
+
+    def __init__(self, task_command: str, taskrc: Path) -> None:
+        self.task_command: str = task_command
+        self.taskrc: str = get_taskrc_location(taskrc)
+        self.lock: Lock = Lock()
+        self.processes: set[subprocess.Popen] = set()
+        self.cancelled: bool = False
+
+    def cancel(self) -> None:
+        with self.lock:
+            self.cancelled = True
+            for process in self.processes:
+                process.kill()
+
+    def reset_cancel(self) -> None:
+        with self.lock:
+            self.cancelled = False
+
+    @contextmanager
+    def run_process(self, command: list[str], stdout: int, stderr: IO[bytes]) -> Iterator[subprocess.Popen]:
+        """Starts the command, tracking it so cancel can kill it, and raises TaskExportCancelled if it was"""
+        with self.lock:
+            if self.cancelled:
+                raise TaskExportCancelled(f"Cancelled before running: {' '.join(command)}")
+            process: subprocess.Popen = subprocess.Popen(command, stdout=stdout, stderr=stderr, env=self.get_env())
+            self.processes.add(process)
+
+        try:
+            with process:
+                try:
+                    yield process
+                except TaskExportError:
+                    # A killed export usually fails part way through a line
+                    if self.cancelled:
+                        raise TaskExportCancelled(f"Cancelled: {' '.join(command)}")
+                    raise
+        finally:
+            with self.lock:
+                self.processes.discard(process)
+
+        if self.cancelled:
+            raise TaskExportCancelled(f"Cancelled: {' '.join(command)}")
+        if process.returncode:
+            stderr.seek(0)
+            error_msg: str = stderr.read().decode("utf-8", errors="replace").strip()
+            raise TaskExportError(f"{error_msg}\nCommand used: {' '.join(command)}")
+
+    def get_command(self, args: list[str]) -> list[str]:
+        return self.task_command.split() + EXPORT_OVERRIDES + args
+
+    def get_env(self) -> dict[str, str]:
+        env: dict[str, str] = os.environ.copy()
+        env["TASKRC"] = self.taskrc
+        return env
+
+    def export(self, filter_args: list[str]) -> Iterator[TaskRecord]:
+        command: list[str] = self.get_command(filter_args + ["export"])
+        with tempfile.TemporaryFile() as stderr:
+            with self.run_process(command, stdout=subprocess.PIPE, stderr=stderr) as process:
+                assert process.stdout is not None
+                for line in process.stdout:
+                    line = line.strip().rstrip(b",")
+                    if not line or line in (b"[", b"]"):
+                        continue
+                    try:
+                        yield TaskRecord(json.loads(line))
+                    except (ValueError, KeyError) as e:
+                        raise TaskExportError(f"Invalid task export line: {line[:200]!r}") from e
+
+    def export_pending(self, filter_args: Optional[list[str]] = None) -> list[TaskRecord]:
+        return list(self.export(["status:pending"] + (filter_args or [])))
+
+    def list_uuids(self, filter_args: list[str]) -> set[str]:
+        """Returns the uuids of the matching tasks, which is much cheaper than exporting them"""
+        command: list[str] = self.get_command(filter_args + ["_uuids"])
+        with tempfile.TemporaryFile() as stderr:
+            with self.run_process(command, stdout=subprocess.PIPE, stderr=stderr) as process:
+                assert process.stdout is not None
+                output: bytes = process.stdout.read()
+        return set(output.decode("utf-8", errors="replace").split())
@@ -0,0 +1,281 @@
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Iterable, Mapping, Optional
+from taskaway.command_runner import TaskCommandRunner
+from taskaway.constants import DELTA_SYNC_LISTING_SECONDS, DELTA_SYNC_MAX_FETCH
+from taskaway.perf import PerfStats
+from taskaway.task_export import (
+    TaskExportError,
+    TaskExporter,
+    TaskRecord,
+    format_task_date,
+    get_tree_project,
+    parse_task_date,
+)
+from taskaway.taskaway_types import ViewState, get_export_filter
+
+SOURCE_NAME_PATTERN = re.compile(r"[^\w-]+")
+
+
+def get_source_name(taskrc: Path) -> str:
+    """Names a source after the directory holding its taskrc, e.g. work for ~/work/.taskrc"""
+    name: str = SOURCE_NAME_PATTERN.sub("_", taskrc.expanduser().resolve().parent.name).strip("_")
+    return name or "task"
+
+
+def parse_task_configs(values: list[str]) -> dict[str, Path]:
+    """Parses --task_config values, each a taskrc path optionally prefixed with a source name, for example
+    work=~/work/.taskrc. Sources that are not named are named after the directory holding their taskrc, made unique
+    with a number
+    """
+    task_configs: dict[str, Path] = {}
+    for value in values:
+        name, separator, path = value.partition("=")
+        if not separator:
+            name, path = get_source_name(Path(value)), value
+        # Project names are dot separated and source names are the top level project
+        name = SOURCE_NAME_PATTERN.sub("_", name) or "task"
+        unique_name: str = name
+        number: int = 2
+        while unique_name in task_configs:
+            unique_name = f"{name}{number}"
+            number += 1
+        task_configs[unique_name] = Path(path)
+    return task_configs
+
+
+class SyncResult:
+    """Changes exported from a source. tasks are pending tasks to add or replace and removed are uuids of tasks that
+    are no longer pending. present, when not None, holds every pending task of the source in the view, the source's
+    other tasks are removed
+    """
+
+    def __init__(
+        self,
+        source: Optional[str],
+        tasks: Optional[list[TaskRecord]] = None,
+        removed: Optional[set[str]] = None,
+        present: Optional[set[str]] = None,
+    ) -> None:
+        self.source: Optional[str] = source
+        self.tasks: list[TaskRecord] = tasks if tasks is not None else []
+        self.removed: set[str] = removed if removed is not None else set()
+        self.present: Optional[set[str]] = present
+
+
+class TaskSource:
+    """A taskrc and the task warrior data it points at. When several sources are loaded each source's tasks are
+    shown under a top level project named after it, and the commands for its tasks are run with its taskrc. name is
+    None when there is only one source, which is shown without the extra project
+    """
+
+    def __init__(
+        self, name: Optional[str], task_command: str, taskrc: Path, perf: PerfStats, delta_sync: bool = False
+    ) -> None:
+        self.name: Optional[str] = name
+        self.taskrc: Path = taskrc
+        self.runner: TaskCommandRunner = TaskCommandRunner(task_command=task_command, taskrc=taskrc, perf=perf)
+        self.exporter: TaskExporter = TaskExporter(task_command=task_command, taskrc=taskrc)
+        self.perf: PerfStats = perf
+        self.delta_sync: bool = delta_sync
+        # Latest modified time exported, and the filter of the full export it started from, None until there is one
+        self.modified_mark: Optional[str] = None
+        self.synced_filter: Optional[list[str]] = None
+        self.last_listing: float = 0.0
+
+    def contains_project(self, tree_project: str) -> bool:
+        return self.name is None or tree_project == self.name or tree_project.startswith(f"{self.name}.")
+
+    def get_project(self, tree_project: Optional[str]) -> Optional[str]:
+        """Returns the task warrior project for a project shown in this source"""
+        if self.name is None or not tree_project:
+            return tree_project
+        if tree_project == self.name:
+            return None
+        return tree_project.partition(".")[2]
+
+    def get_export_filter(self, view: ViewState) -> Optional[list[str]]:
+        """Returns the export filter for the view, or None if the project filter is outside this source"""
+        if view.project_filter and not self.contains_project(view.project_filter):
+            return None
+        return get_export_filter(self.get_project(view.project_filter), view.tag_filter)
+
+    def export(self, filter_args: list[str]) -> list[TaskRecord]:
+        """Exports the matching tasks, moving the modified mark on to the latest modified time seen"""
+        self.perf.count("subprocesses")
+        tasks: list[TaskRecord] = list(self.exporter.export(filter_args))
+        for task in tasks:
+            if task.modified is not None and (self.modified_mark is None or task.modified > self.modified_mark):
+                self.modified_mark = task.modified
+            if self.name is not None:
+                self.assign(task)
+        return tasks
+
+    def reset_sync(self) -> None:
+        """Makes the next sync a full export"""
+        self.modified_mark = None
+        self.synced_filter = None
+
+    def sync(self, view: ViewState, known: set[str], stale: set[str]) -> SyncResult:
+        """Exports the changes to the source's pending tasks in the view, known being the uuids of the source's
+        tasks in the store. Without delta sync, or when the view's filter has not been exported in full yet, that is
+        every pending task. Otherwise it is the tasks modified since the latest modified time seen, whatever their
+        status and whether or not they are in the view, and the stale uuids, tasks the store only holds a local copy
+        of. Changed tasks that are no longer pending or have left the view are removed. Tasks that leave the data files
+        without being modified are found by listing the uuids of the pending tasks every DELTA_SYNC_LISTING_SECONDS,
+        which also exports the listed tasks that are missing
+        """
+        filter_args: Optional[list[str]] = self.get_export_filter(view)
+        if filter_args is None:
+            self.reset_sync()
+            return SyncResult(source=self.name, present=set())
+
+        pending_filter: list[str] = ["status:pending"] + filter_args
+        if self.delta_sync and self.modified_mark is not None and filter_args == self.synced_filter:
+            result: Optional[SyncResult] = self.sync_changes(view, filter_args, known, set(stale))
+            if result is not None:
+                return result
+
+        self.reset_sync()
+        tasks: list[TaskRecord] = self.export(pending_filter)
+        self.synced_filter = filter_args
+        self.last_listing = time.monotonic()
+        return SyncResult(source=self.name, tasks=tasks, present={task.uuid for task in tasks})
+
+    def sync_changes(
+        self, view: ViewState, filter_args: list[str], known: set[str], stale: set[str]
+    ) -> Optional[SyncResult]:
+        """Exports the tasks changed since the modified mark, None if a full export would be cheaper. The changes are
+        exported without the view's filter, so tasks edited out of the view are seen, and matched against it here
+        """
+        # task warrior keeps modified to the second and modified.after is exclusive, go back a second to also catch
+        # tasks modified later in the second of the mark
+        mark: Optional[datetime] = parse_task_date(self.modified_mark)
+        assert mark is not None
+        after: str = format_task_date(mark - timedelta(seconds=1))
+        tasks: list[TaskRecord] = self.export([f"modified.after:{after}"])
+        self.perf.count("delta_syncs")
+
+        present: Optional[set[str]] = None
+        if time.monotonic() - self.last_listing >= DELTA_SYNC_LISTING_SECONDS:
+            self.last_listing = time.monotonic()
+            self.perf.count("subprocesses")
+            present = self.exporter.list_uuids(["status:pending"] + filter_args)
+            stale |= present - known
+
+        stale -= {task.uuid for task in tasks}
+        if len(stale) > DELTA_SYNC_MAX_FETCH:
+            return None
+
+        result: SyncResult = SyncResult(source=self.name, present=present)
+        if stale:
+            # Stale tasks the export leaves out have been deleted
+            fetched: list[TaskRecord] = self.export([",".join(sorted(stale))])
+            result.removed = stale - {task.uuid for task in fetched}
+            tasks += fetched
+        for task in tasks:
+            if task.status == "pending" and view.matches_export_filter(task):
+                result.tasks.append(task)
+            else:
+                result.removed.add(task.uuid)
+        return result
+
+    def assign(self, task: TaskRecord) -> None:
+        """Marks a task exported from this source, moving it under the source's project"""
+        task.source = self.name
+        task.project = get_tree_project(self.name, task.project)
+
+    def __repr__(self):
+        return f"TaskSource(name={self.name}, taskrc={self.taskrc})"
+
+
+class TaskSources:
+    """The sources tasks are loaded from. Exports run in parallel, one thread per source, so a refresh takes as long
+    as the slowest source rather than all of them. Tasks are routed back to their source by their project
+    """
+
+    def __init__(
+        self, task_configs: dict[str, Path], task_command: str, perf: PerfStats, delta_sync: bool = False
+    ) -> None:
+        single: bool = len(task_configs) == 1
+        self.sources: list[TaskSource] = [
+            TaskSource(
+                name=None if single else name,
+                task_command=task_command,
+                taskrc=taskrc,
+                perf=perf,
+                delta_sync=delta_sync,
+            )
+            for name, taskrc in task_configs.items()
+        ]
+
+    def __len__(self) -> int:
+        return len(self.sources)
+
+    @property
+    def taskrcs(self) -> list[Path]:
+        return [source.taskrc for source in self.sources]
+
+    def get_for_project(self, tree_project: Optional[str]) -> TaskSource:
+        """Returns the source a project is shown in, the first source if there is no project"""
+        if tree_project:
+            for source in self.sources:
+                if source.contains_project(tree_project):
+                    return source
+        return self.sources[0]
+
+    def get_for_task(self, task: Optional[TaskRecord]) -> TaskSource:
+        return self.get_for_project(task.project if task is not None else None)
+
+    def group_by_source(
+        self, uuids: Iterable[str], tasks: Mapping[str, Optional[TaskRecord]]
+    ) -> dict[TaskSource, list[str]]:
+        """Splits the uuids by their task's source, keeping the order they were given in"""
+        groups: dict[TaskSource, list[str]] = {}
+        for uuid in uuids:
+            groups.setdefault(self.get_for_task(tasks.get(uuid)), []).append(uuid)
+        return groups
+
+    def assign(self, tasks: Iterable[TaskRecord]) -> None:
+        """Marks tasks that already have their source's project, e.g. cached ones, with their source"""
+        for task in tasks:
+            source: TaskSource = self.get_for_task(task)
+            task.source = source.name
+
+    def sync(
+        self, view: ViewState, known: Mapping[Optional[str], set[str]], stale: Mapping[Optional[str], set[str]]
+    ) -> list[SyncResult]:
+        """Syncs every source, known and stale holding the uuids of the tasks and of the local copies in the store by
+        source name. If any export fails or is cancelled nothing is merged, so every source goes back to the sync
+        state it started from
+        """
+
+        def sync_source(source: TaskSource) -> SyncResult:
+            return source.sync(view, known.get(source.name, set()), stale.get(source.name, set()))
+
+        states: list[tuple[Optional[str], Optional[list[str]], float]] = []
+        for source in self.sources:
+            source.exporter.reset_cancel()
+            states.append((source.modified_mark, source.synced_filter, source.last_listing))
+        try:
+            if len(self.sources) == 1:
+                return [sync_source(self.sources[0])]
+
+            with ThreadPoolExecutor(max_workers=len(self.sources), thread_name_prefix="task_export") as pool:
+                return list(pool.map(sync_source, self.sources))
+        except TaskExportError:
+            for source, (modified_mark, synced_filter, last_listing) in zip(self.sources, states):
+                source.modified_mark, source.synced_filter, source.last_listing = (
+                    modified_mark,
+                    synced_filter,
+                    last_listing,
+                )
+            raise
+
+    def cancel(self) -> None:
+        """Kills the running exports of every source, making the sync running them raise TaskExportCancelled"""
+        for source in self.sources:
+            source.exporter.cancel()
@@ -0,0 +1,204 @@
+from threading import RLock
+from typing import Iterable, Optional
+from taskaway.constants import TASK_PROJECT, TASK_TAGS, TASK_UUID
+from taskaway.search_index import SearchIndex
+from taskaway.task_export import TaskRecord
+from taskaway.utils import ProjectNode, ProjectTrie, get_project_prefixes
+
+
+class TaskStore:
+    """Owns the loaded tasks keyed by uuid, along with project and tag indexes that are updated incrementally as
+    tasks are added, changed and removed. Writers and readers from other threads should hold lock
+    """
+
+    def __init__(self) -> None:
+        self.lock: RLock = RLock()
+        self.tasks: dict[str, TaskRecord] = {}
+        # Project -> tasks in that project or any of its sub projects
+        self.project_index: dict[str, set[str]] = {}
+        self.projects: ProjectTrie = ProjectTrie()
+        self.tag_index: dict[str, set[str]] = {}
+        self.active_tasks: set[str] = set()
+        # Built the first time a search is made, as most sessions never search
+        self.search_index: Optional[SearchIndex] = None
+        # Tasks with local changes whose task warrior command has not finished, exports leave these alone
+        self.local_changes: dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.tasks)
+
+    def get(self, uuid: str) -> Optional[TaskRecord]:
+        return self.tasks.get(uuid)
+
+    def update(self, tasks: Iterable[TaskRecord]) -> set[str]:
+        """Replaces the stored tasks with the given tasks, only re-indexing tasks that are new or have changed.
+        Returns the uuids of all tasks that were added, changed or removed
+        """
+        changed: set[str] = set()
+        with self.lock:
+            seen: set[str] = set()
+            for task in tasks:
+                uuid: str = task[TASK_UUID]
+                seen.add(uuid)
+                if uuid in self.local_changes:
+                    continue
+
+                current: Optional[TaskRecord] = self.tasks.get(uuid)
+                if current is not None and current.version == task.version:
+                    continue
+
+                self.remove_task(uuid)
+                self.add_task(task)
+                changed.add(uuid)
+
+            for uuid in [uuid for uuid in self.tasks if uuid not in seen and uuid not in self.local_changes]:
+                self.remove_task(uuid)
+                changed.add(uuid)
+
+        return changed
+
+    def merge(
+        self,
+        tasks: Iterable[TaskRecord],
+        removed: Iterable[str] = (),
+        present: Optional[set[str]] = None,
+        source: Optional[str] = None,
+    ) -> set[str]:
+        """Adds the given tasks or replaces them if they have changed, and removes the removed uuids. When present is
+        given it holds every task from source that should be kept, and the source's other tasks are removed too.
+        Tasks with local changes are left alone. Returns the uuids of all tasks that were added, changed or removed
+        """
+        changed: set[str] = set()
+        with self.lock:
+            for task in tasks:
+                uuid: str = task[TASK_UUID]
+                if uuid in self.local_changes:
+                    continue
+
+                current: Optional[TaskRecord] = self.tasks.get(uuid)
+                if current is not None and current.version == task.version:
+                    continue
+
+                self.remove_task(uuid)
+                self.add_task(task)
+                changed.add(uuid)
+
+            gone: set[str] = set(removed)
+            if present is not None:
+                gone |= {uuid for uuid, task in self.tasks.items() if task.source == source and uuid not in present}
+            for uuid in gone:
+                if uuid in self.tasks and uuid not in self.local_changes:
+                    self.remove_task(uuid)
+                    changed.add(uuid)
+
+        return changed
+
+    def get_sync_uuids(self) -> tuple[dict[Optional[str], set[str]], dict[Optional[str], set[str]]]:
+        """Returns the uuids of the stored tasks by source, and of the local copies whose local change has finished,
+        which have no modified time and need exporting again
+        """
+        known: dict[Optional[str], set[str]] = {}
+        stale: dict[Optional[str], set[str]] = {}
+        with self.lock:
+            for uuid, task in self.tasks.items():
+                known.setdefault(task.source, set()).add(uuid)
+                if task.modified is None and uuid not in self.local_changes:
+                    stale.setdefault(task.source, set()).add(uuid)
+        return known, stale
+
+    def add_task(self, task: TaskRecord) -> None:
+        uuid: str = task[TASK_UUID]
+        project: str = task[TASK_PROJECT] or ""
+        with self.lock:
+            self.tasks[uuid] = task
+            self.projects.add_task(project, uuid)
+            for prefix in get_project_prefixes(project):
+                self.project_index.setdefault(prefix, set()).add(uuid)
+            for tag in task[TASK_TAGS]:
+                if tag:
+                    self.tag_index.setdefault(tag, set()).add(uuid)
+            if task.active:
+                self.active_tasks.add(uuid)
+            if self.search_index is not None:
+                self.search_index.add(task)
+
+    def remove_task(self, uuid: str) -> None:
+        with self.lock:
+            task: Optional[TaskRecord] = self.tasks.pop(uuid, None)
+            if task is None:
+                return
+
+            project: str = task[TASK_PROJECT] or ""
+            self.projects.remove_task(project, uuid)
+            for prefix in get_project_prefixes(project):
+                self._discard(self.project_index, prefix, uuid)
+            for tag in task[TASK_TAGS]:
+                if tag:
+                    self._discard(self.tag_index, tag, uuid)
+            self.active_tasks.discard(uuid)
+            if self.search_index is not None:
+                self.search_index.remove(uuid)
+
+    def get_search_index(self) -> SearchIndex:
+        """Returns the search index, building it from the stored tasks the first time. It is kept up to date as tasks
+        are added and removed after that
+        """
+        with self.lock:
+            if self.search_index is None:
+                self.search_index = SearchIndex()
+                for task in self.tasks.values():
+                    self.search_index.add(task)
+            return self.search_index
+
+    def begin_local_change(self, uuid: str, task: Optional[TaskRecord]) -> Optional[TaskRecord]:
+        """Replaces the stored task with a locally changed copy, or removes it if task is None. Returns the previous
+        task so the change can be rolled back
+        """
+        with self.lock:
+            previous: Optional[TaskRecord] = self.tasks.get(uuid)
+            self.local_changes[uuid] = self.local_changes.get(uuid, 0) + 1
+            self.remove_task(uuid)
+            if task is not None:
+                self.add_task(task)
+            return previous
+
+    def end_local_change(self, uuid: str, rollback_task: Optional[TaskRecord] = None) -> None:
+        """Marks a local change as finished, restoring rollback_task if the change failed"""
+        with self.lock:
+            remaining: int = self.local_changes.get(uuid, 1) - 1
+            if remaining > 0:
+                self.local_changes[uuid] = remaining
+            else:
+                self.local_changes.pop(uuid, None)
+
+            if rollback_task is not None:
+                self.remove_task(uuid)
+                self.add_task(rollback_task)
+
+    @staticmethod
+    def _discard(index: dict[str, set[str]], key: str, uuid: str) -> None:
+        uuids: Optional[set[str]] = index.get(key)
+        if uuids is None:
+            return
+        uuids.discard(uuid)
+        if not uuids:
+            del index[key]
+
+    def get_tasks_in_project(self, project: str) -> set[str]:
+        """Returns the uuids of tasks in the project or any of its sub projects"""
+        return self.project_index.get(project, set())
+
+    def get_tasks_in_exact_project(self, project: str) -> set[str]:
+        node: Optional[ProjectNode] = self.projects.get(project)
+        return node.tasks if node else set()
+
+    def get_tasks_with_any_tag(self, tags: Iterable[str]) -> set[str]:
+        uuids: set[str] = set()
+        for tag in tags:
+            uuids |= self.tag_index.get(tag, set())
+        return uuids
+
+    def search(self, query: str) -> set[str]:
+        """Returns the uuids of tasks whose description, tags or annotations contain every word of the query"""
+        with self.lock:
+            return self.get_search_index().search(query)
@@ -0,0 +1,61 @@
+from bisect import bisect_right
+from itertools import accumulate
+from typing import ClassVar
+from rich.style import Style
+from textual.widgets import DataTable
+from textual.widgets.data_table import RowKey
+
+
+class TaskTable(DataTable):
+    """DataTable that highlights a set of marked rows, used for multi row selection. The -stale class dims the table
+    while it shows cached tasks that may no longer match the data. Marks are drawn by overriding private DataTable
+    methods, which is why textual is pinned to a minor release in pyproject.toml
+    """
+
+    COMPONENT_CLASSES: ClassVar[set[str]] = DataTable.COMPONENT_CLASSES | {"task-table--marked"}
+
+    DEFAULT_CSS = """
+    TaskTable.-stale {
+        text-opacity: 60%;
+    }
+
+    TaskTable > .task-table--marked {
+        background: $accent 40%;
+        text-style: bold;
+    }
+    """
+
+    def __init__(self, **kwargs) -> None:
+        self.marked_rows: set[RowKey] = set()
+        super().__init__(**kwargs)
+
+    def set_marked_rows(self, row_keys: set[RowKey]) -> None:
+        if row_keys == self.marked_rows:
+            return
+
+        self.marked_rows = row_keys
+        # Rendered rows are cached without knowing about marks, so they are thrown away when the marks change
+        self._clear_caches()
+        self.refresh()
+
+    def _get_row_style(self, row_index: int, base_style: Style) -> Style:
+        row_style: Style = super()._get_row_style(row_index, base_style)
+        if row_index < 0 or not self.marked_rows:
+            return row_style
+
+        row_key = self._row_locations.get_key(row_index)
+        if row_key not in self.marked_rows:
+            return row_style
+        return row_style + self.get_component_styles("task-table--marked").rich_style
+
+    def get_row_offsets(self) -> list[int]:
+        """Returns the line each row starts at, below the header"""
+        return [0, *accumulate(row.height for row in self.ordered_rows)][:-1]
+
+    def get_visible_rows(self) -> tuple[int, int]:
+        """Returns the indexes of the first and last rows on screen, which are -1 when the table is empty"""
+        offsets: list[int] = self.get_row_offsets()
+        header_height: int = self.header_height if self.show_header else 0
+        top: int = round(self.scroll_y)
+        bottom: int = top + max(1, self.scrollable_content_region.height - header_height) - 1
+        return bisect_right(offsets, top) - 1, bisect_right(offsets, bottom) - 1
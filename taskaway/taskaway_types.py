@@ -1,21 +1,37 @@
 import json
-from taskaway.constants import ALL_VISIBLE_COLUMNS, DEFAULT_VISIBLE_COLUMNS
+from taskaway.constants import (
+    ALL_VISIBLE_COLUMNS,
+    COL_ACTIVE_HIDDEN,
+    COL_DESCRIPTION_HIDDEN,
+    COL_FULL_PROJECT_HIDDEN,
+    COL_SHORT_PROJECT,
+    COL_UUID_HIDDEN,
+    DEFAULT_SORT_ORDER,
+    DEFAULT_VISIBLE_COLUMNS,
+    TASK_PROJECT,
+)
 from pathlib import Path
+from typing import Any, Optional
 from textual.binding import Binding
+from taskaway.row_sort import RowSorter, RowSortKey, parse_sort_order
+from taskaway.task_export import TaskRecord
 
 ColumnDefinitions = list[tuple[str, bool]]
+TableRow = tuple[list[Any], int]
 
 
 class Config:
-    def __init__(self, taskaway_config: Path, column_layout: ColumnDefinitions, theme: str):
+    def __init__(self, taskaway_config: Path, column_layout: ColumnDefinitions, theme: str, sort_order: str):
         self.taskaway_config: Path = taskaway_config.expanduser()
         self.column_layout: ColumnDefinitions = column_layout
         self.theme: str = theme
+        self.sort_order: str = sort_order
 
     def to_dict(self) -> dict:
         return {
             "column_layout": self.column_layout,
             "theme": self.theme,
+            "sort_order": self.sort_order,
         }
 
     def save_to_json(self):
@@ -33,6 +49,7 @@ class Config:
             taskaway_config=taskaway_config,
             column_layout=column_layout,
             theme="gruvbox",
+            sort_order=DEFAULT_SORT_ORDER,
         )
 
     @classmethod
@@ -44,10 +61,17 @@ class Config:
 
         column_layout = [(column, visible) for column, visible in column_layout if column in ALL_VISIBLE_COLUMNS]
 
+        sort_order: str = data.get("sort_order", DEFAULT_SORT_ORDER)
+        try:
+            parse_sort_order(sort_order)
+        except ValueError:
+            sort_order = DEFAULT_SORT_ORDER
+
         return cls(
             taskaway_config=taskaway_config,
             column_layout=column_layout,
             theme=data["theme"],
+            sort_order=sort_order,
         )
 
     @classmethod
@@ -64,7 +88,109 @@ class Config:
         return cls.from_dict(taskaway_config=taskaway_config, data=data)
 
     def __repr__(self):
-        return f"Config(column_layout={self.column_layout}, theme={self.theme})"
+        return f"Config(column_layout={self.column_layout}, theme={self.theme}, sort_order={self.sort_order})"
+
+
+class ColumnSchema:
+    """The full set of table columns derived from a column layout, including the hidden helper columns, with
+    precomputed column index lookups
+    """
+
+    def __init__(self, column_layout: ColumnDefinitions) -> None:
+        self.column_layout: ColumnDefinitions = list(column_layout)
+        self.column_widths: dict[str, Optional[int]] = (
+            {
+                COL_SHORT_PROJECT: None,
+            }
+            | {col_name: None for col_name, show_col in column_layout if show_col}
+            | {
+                COL_DESCRIPTION_HIDDEN: 0,
+                COL_ACTIVE_HIDDEN: 0,
+                COL_FULL_PROJECT_HIDDEN: 0,
+                COL_UUID_HIDDEN: 0,
+            }
+        )
+        self.columns: list[str] = list(self.column_widths)
+        self.column_indexes: dict[str, int] = {column: index for index, column in enumerate(self.columns)}
+
+    def matches_layout(self, column_layout: ColumnDefinitions) -> bool:
+        return self.column_layout == list(column_layout)
+
+    def __repr__(self):
+        return f"ColumnSchema(columns={self.columns})"
+
+
+def get_export_filter(project_filter: Optional[str], tag_filter: list[str]) -> list[str]:
+    filter_args: list[str] = []
+    if project_filter:
+        filter_args.append(f"{TASK_PROJECT}:{project_filter}")
+    if tag_filter:
+        tag_args: list[str] = []
+        for tag in tag_filter:
+            tag_args += ["or", f"+{tag}"] if tag_args else [f"+{tag}"]
+        filter_args += ["(", *tag_args, ")"]
+    return filter_args
+
+
+class ViewState:
+    """The view settings that table rows are built for, captured so rows can be built away from the UI thread"""
+
+    def __init__(
+        self,
+        project_filter: str,
+        tag_filter: list[str],
+        expanded_projects: set[str],
+        column_schema: ColumnSchema,
+        row_sorter: RowSorter,
+        search: str = "",
+    ) -> None:
+        self.project_filter: str = project_filter
+        self.tag_filter: list[str] = list(tag_filter)
+        self.expanded_projects: frozenset[str] = frozenset(expanded_projects)
+        self.column_schema: ColumnSchema = column_schema
+        self.row_sorter: RowSorter = row_sorter
+        # Searches are answered from the loaded tasks, so unlike the filters they are not part of the export filter
+        self.search: str = search
+
+    def get_export_filter(self) -> list[str]:
+        """Returns the task warrior filter arguments selecting the tasks the project and tag filters can show, so
+        filtered views only export the tasks they need
+        """
+        return get_export_filter(self.project_filter, self.tag_filter)
+
+    def matches_export_filter(self, task: TaskRecord) -> bool:
+        """Returns True if the export filter selects the task, whose project includes its source as in the view"""
+        project: str = task.project or ""
+        if self.project_filter and project != self.project_filter and not project.startswith(f"{self.project_filter}."):
+            return False
+        return not self.tag_filter or any(tag in task.tags for tag in self.tag_filter)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, ViewState):
+            return NotImplemented
+        return (
+            self.project_filter == other.project_filter
+            and self.tag_filter == other.tag_filter
+            and self.expanded_projects == other.expanded_projects
+            and self.column_schema is other.column_schema
+            and self.row_sorter is other.row_sorter
+            and self.search == other.search
+        )
+
+    def __repr__(self):
+        return f"ViewState(project_filter={self.project_filter}, tag_filter={self.tag_filter}, search={self.search})"
+
+
+class TaskSnapshot:
+    """The table rows, and their sort keys, built from the loaded tasks for a view"""
+
+    def __init__(self, rows: dict[str, TableRow], sort_keys: dict[str, RowSortKey], view: ViewState) -> None:
+        self.rows: dict[str, TableRow] = rows
+        self.sort_keys: dict[str, RowSortKey] = sort_keys
+        self.view: ViewState = view
+
+    def __repr__(self):
+        return f"TaskSnapshot(rows={len(self.rows)})"
 
 
 class TaskAwayBinding(Binding):
@@ -1,8 +1,9 @@
+import math
 from datetime import timedelta
-from tasklib import Task
-from datetime import datetime, timezone
-from typing import Optional
+from datetime import datetime
+from typing import Any, Callable, Iterable, Optional
 
+from taskaway.task_export import TaskRecord
 from taskaway.constants import (
     COL_ACTIVE,
     COL_ACTIVE_HIDDEN,
@@ -54,61 +55,256 @@ def get_time_representation(delta: timedelta) -> str:
     return f"{sign}{int(total_days/365)}y"
 
 
-def get_parent_project(project: str) -> str:
-    """Returns the parent project of a given project
+def get_time_representation_expiry(delta: timedelta, rate: int) -> float:
+    """Returns the number of seconds until get_time_representation will return a different string for a timedelta
+    that changes by rate (1 or -1) seconds every second. May be early but is never late
+    """
+    seconds: float = delta.total_seconds()
+    magnitude: float = abs(seconds)
+    whole_seconds: int = int(magnitude)
+    if whole_seconds < 60:
+        unit = 1
+    elif whole_seconds < 60 * 60:
+        unit = 60
+    elif whole_seconds < 60 * 60 * 24:
+        unit = 60 * 60
+    elif whole_seconds < 60 * 60 * 24 * 365:
+        unit = 60 * 60 * 24
+    else:
+        unit = 60 * 60 * 24 * 365
+
+    boundary: int = (whole_seconds // unit) * unit
+    growing: bool = (seconds >= 0) == (rate > 0)
+    if growing:
+        return boundary + unit - magnitude
+    return magnitude - boundary
+
+
+def get_project_prefixes(project: str) -> list[str]:
+    """Returns the project along with all of its parent projects
     example:
-        'foo.bar' -> 'foo'
-        'foo' -> ''
+        'foo.bar.baz' -> ['foo', 'foo.bar', 'foo.bar.baz']
+        '' -> []
     """
     if not project:
-        return ""
-    return ".".join(project.split(".")[:-1])
+        return []
+    parts: list[str] = project.split(".")
+    return [".".join(parts[: i + 1]) for i in range(len(parts))]
+
+
+class ProjectNode:
+    """A project in the project hierarchy, holding the tasks directly in the project"""
+
+    def __init__(self, name: str, path: str, parent: Optional["ProjectNode"]) -> None:
+        self.name: str = name
+        self.path: str = path
+        self.parent: Optional["ProjectNode"] = parent
+        self.children: dict[str, "ProjectNode"] = {}
+        self.tasks: set[str] = set()
+        self.subtree_task_count: int = 0
+        self.expanded: bool = False
 
+    @property
+    def task_count(self) -> int:
+        return len(self.tasks)
 
-def get_all_projects_from_tasks(tasks: list[Task]) -> set[str]:
-    """Given a set of tasks will return the set of full length name projects as well as the full name of all
-    parent projects of the tasks
+    def __repr__(self):
+        return f"ProjectNode(path={self.path}, tasks={self.task_count}, subtree_tasks={self.subtree_task_count})"
+
+
+class ProjectTrie:
+    """The project hierarchy of a set of tasks, maintained incrementally as tasks are added and removed. Tasks without
+    a project belong to the root node, whose path is '' and which is always expanded. Projects are pruned once no
+    tasks remain in their subtree, pruned projects that were expanded are expanded again if they come back
     """
-    projects: set[str] = set()
-    for task in tasks:
-        task_project: str = task["project"]
-        project = str(task_project) if task_project else ""
-
-        while project:
-            projects.add(project)
-
-            last_dot: int = project.rfind(".")
-            if last_dot == -1:
-                break
-
-            project = project[0:last_dot]
-    return projects
-
-
-def get_column_value_for_task(task: Task, column_name: str) -> str:
-    if column_name == COL_AGE:
-        return get_time_representation(task[TASK_ENTRY] - datetime.now(tz=timezone.utc))
-    elif column_name == COL_DESCRIPTION or column_name == COL_DESCRIPTION_HIDDEN:
-        return task[TASK_DESCRIPTION]
-    elif column_name == COL_FULL_PROJECT or column_name == COL_FULL_PROJECT_HIDDEN:
-        return task[TASK_PROJECT]
-    elif column_name == COL_SHORT_PROJECT:
-        return None
-    elif column_name == COL_TAGS:
-        return ",".join(task[TASK_TAGS])
-    elif column_name == COL_URGENCY:
-        return task[TASK_URGENCY]
-    elif column_name == COL_DUE:
-        due: Optional[datetime] = task[TASK_DUE]
-        return get_time_representation(datetime.now(tz=timezone.utc) - due) if due else None
-    elif column_name == COL_UUID or column_name == COL_UUID_HIDDEN:
-        return task[TASK_UUID]
-    elif column_name == COL_ANNOTATIONS:
-        return "\n".join(f"{x['entry'].strftime('%Y-%m-%d')}: {x['description']}" for x in task[TASK_ANNOTATIONS])
-    elif column_name == COL_ACTIVE:
-        started: Optional[datetime] = task[TASK_STARTED]
-        return get_time_representation(started - datetime.now(tz=timezone.utc)) if started else None
-    elif column_name == COL_ACTIVE_HIDDEN:
-        started: Optional[datetime] = task[TASK_STARTED]
-        return int((datetime.now(tz=timezone.utc) - started).total_seconds()) if started else 999999999
-    raise RuntimeError(f"unsupported column name {column_name}")
+
+    def __init__(self) -> None:
+        self.root: ProjectNode = ProjectNode(name="", path="", parent=None)
+        self.root.expanded = True
+        self.nodes: dict[str, ProjectNode] = {"": self.root}
+        self.pruned_expanded: set[str] = set()
+
+    def __contains__(self, project: str) -> bool:
+        return project in self.nodes
+
+    def get(self, project: str) -> Optional[ProjectNode]:
+        return self.nodes.get(project)
+
+    def get_projects(self) -> list[str]:
+        """Returns every project and parent project that has at least one task"""
+        return [path for path in self.nodes if path]
+
+    def add_task(self, project: Optional[str], uuid: str) -> None:
+        node: ProjectNode = self.root
+        node.subtree_task_count += 1
+        for name in project.split(".") if project else []:
+            child: Optional[ProjectNode] = node.children.get(name)
+            if child is None:
+                child = ProjectNode(name=name, path=f"{node.path}.{name}" if node.path else name, parent=node)
+                if child.path in self.pruned_expanded:
+                    self.pruned_expanded.discard(child.path)
+                    child.expanded = True
+                node.children[name] = child
+                self.nodes[child.path] = child
+            node = child
+            node.subtree_task_count += 1
+        node.tasks.add(uuid)
+
+    def remove_task(self, project: Optional[str], uuid: str) -> None:
+        node: Optional[ProjectNode] = self.nodes.get(project or "")
+        if node is None or uuid not in node.tasks:
+            return
+
+        node.tasks.discard(uuid)
+        while node is not None:
+            node.subtree_task_count -= 1
+            parent: Optional[ProjectNode] = node.parent
+            if parent is not None and node.subtree_task_count == 0:
+                del parent.children[node.name]
+                del self.nodes[node.path]
+                if node.expanded:
+                    self.pruned_expanded.add(node.path)
+            node = parent
+
+    def is_in_subtree(self, project: str, root: str) -> bool:
+        """Returns True if the project is the root project or one of its sub projects"""
+        node: Optional[ProjectNode] = self.nodes.get(project)
+        while node is not None:
+            if node.path == root:
+                return True
+            node = node.parent
+        return False
+
+    def get_expanded_projects(self) -> set[str]:
+        expanded: set[str] = set()
+        pending: list[ProjectNode] = [self.root]
+        while pending:
+            node: ProjectNode = pending.pop()
+            if node.expanded:
+                expanded.add(node.path)
+                pending.extend(node.children.values())
+        return expanded
+
+    def expand(self, projects: Iterable[str]) -> None:
+        """Expands the given projects, ignoring any that no longer exist"""
+        for project in projects:
+            node: Optional[ProjectNode] = self.nodes.get(project)
+            if node is not None:
+                node.expanded = True
+
+    def toggle_expanded(self, project: str) -> None:
+        """Expands a collapsed project, or collapses an expanded project along with all of its sub projects"""
+        node: Optional[ProjectNode] = self.nodes.get(project)
+        if node is None or node is self.root:
+            return
+
+        if not node.expanded:
+            node.expanded = True
+            return
+
+        pending: list[ProjectNode] = [node]
+        while pending:
+            collapsing: ProjectNode = pending.pop()
+            collapsing.expanded = False
+            pending.extend(collapsing.children.values())
+        self.pruned_expanded = {path for path in self.pruned_expanded if not path.startswith(f"{project}.")}
+
+
+def get_age_with_expiry(task: TaskRecord, now: datetime) -> tuple[Optional[str], float]:
+    delta: timedelta = task[TASK_ENTRY] - now
+    return get_time_representation(delta), get_time_representation_expiry(delta, -1)
+
+
+def get_age(task: TaskRecord, now: datetime) -> Optional[str]:
+    return get_age_with_expiry(task, now)[0]
+
+
+def get_description(task: TaskRecord, now: datetime) -> Optional[str]:
+    return task[TASK_DESCRIPTION]
+
+
+def get_project(task: TaskRecord, now: datetime) -> Optional[str]:
+    return task[TASK_PROJECT]
+
+
+def get_short_project(task: TaskRecord, now: datetime) -> Optional[str]:
+    """Task rows sit beneath their project row so only show the project for active tasks, which are listed first"""
+    return task[TASK_PROJECT] if task.active else None
+
+
+def get_tags(task: TaskRecord, now: datetime) -> Optional[str]:
+    return ",".join(task[TASK_TAGS])
+
+
+def get_urgency(task: TaskRecord, now: datetime) -> Optional[float]:
+    return task[TASK_URGENCY]
+
+
+def get_due_with_expiry(task: TaskRecord, now: datetime) -> tuple[Optional[str], float]:
+    due: Optional[datetime] = task[TASK_DUE]
+    if not due:
+        return None, math.inf
+    delta: timedelta = now - due
+    return get_time_representation(delta), get_time_representation_expiry(delta, 1)
+
+
+def get_due(task: TaskRecord, now: datetime) -> Optional[str]:
+    return get_due_with_expiry(task, now)[0]
+
+
+def get_uuid(task: TaskRecord, now: datetime) -> Optional[str]:
+    return task[TASK_UUID]
+
+
+def format_annotation(annotation: dict[str, Any]) -> str:
+    return f"{annotation['entry'].astimezone().strftime('%Y-%m-%d')}: {annotation['description']}"
+
+
+def get_annotations(task: TaskRecord, now: datetime) -> Optional[str]:
+    return "\n".join(format_annotation(x) for x in task[TASK_ANNOTATIONS])
+
+
+def get_active_with_expiry(task: TaskRecord, now: datetime) -> tuple[Optional[str], float]:
+    started: Optional[datetime] = task[TASK_STARTED]
+    if not started:
+        return None, math.inf
+    delta: timedelta = started - now
+    return get_time_representation(delta), get_time_representation_expiry(delta, -1)
+
+
+def get_active(task: TaskRecord, now: datetime) -> Optional[str]:
+    return get_active_with_expiry(task, now)[0]
+
+
+def get_active_sort_key(task: TaskRecord, now: datetime) -> int:
+    started: Optional[datetime] = task[TASK_STARTED]
+    # Most recently started first, relative to the epoch so the value is stable between redraws
+    return -int(started.timestamp()) if started else 999999999
+
+
+ColumnExtractor = Callable[[TaskRecord, datetime], Any]
+# Extractors for time dependent columns, returning the value and the number of seconds it remains valid for
+TimeColumnExtractor = Callable[[TaskRecord, datetime], tuple[Any, float]]
+
+TIME_COLUMN_EXTRACTORS: dict[str, TimeColumnExtractor] = {
+    COL_AGE: get_age_with_expiry,
+    COL_DUE: get_due_with_expiry,
+    COL_ACTIVE: get_active_with_expiry,
+}
+
+COLUMN_EXTRACTORS: dict[str, ColumnExtractor] = {
+    COL_AGE: get_age,
+    COL_DESCRIPTION: get_description,
+    COL_DESCRIPTION_HIDDEN: get_description,
+    COL_FULL_PROJECT: get_project,
+    COL_FULL_PROJECT_HIDDEN: get_project,
+    COL_SHORT_PROJECT: get_short_project,
+    COL_TAGS: get_tags,
+    COL_URGENCY: get_urgency,
+    COL_DUE: get_due,
+    COL_UUID: get_uuid,
+    COL_UUID_HIDDEN: get_uuid,
+    COL_ANNOTATIONS: get_annotations,
+    COL_ACTIVE: get_active,
+    COL_ACTIVE_HIDDEN: get_active_sort_key,
+}
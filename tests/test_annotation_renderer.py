@@ -0,0 +1,30 @@
+from taskaway.annotation_renderer import AnnotationRenderer
+from taskaway.task_export import TaskRecord
+
+
+def make_task(modified: str, *descriptions: str) -> TaskRecord:
+    annotations = [{"entry": "20250101T093000Z", "description": description} for description in descriptions]
+    return TaskRecord({"uuid": "a", "modified": modified, "annotations": annotations})
+
+
+def test_summary_shows_latest_annotation_and_count():
+    renderer = AnnotationRenderer()
+    assert renderer.render(make_task("20250101T093000Z", "first", "second\nline")) == (
+        "2025-01-01: second line (+1 more)",
+        1,
+    )
+
+
+def test_summary_follows_edited_annotation_with_same_count():
+    renderer = AnnotationRenderer()
+    renderer.render(make_task("20250101T093000Z", "old text"))
+    assert renderer.render(make_task("20250102T093000Z", "new text")) == ("2025-01-01: new text", 1)
+
+
+def test_expanded_task_gets_a_line_per_annotation():
+    renderer = AnnotationRenderer()
+    task = make_task("20250101T093000Z", "first", "second")
+    assert renderer.toggle_expanded(task) == ["a"]
+    assert renderer.render(task) == ("2025-01-01: first\n2025-01-01: second", 2)
+    assert renderer.toggle_expanded(task) == ["a"]
+    assert renderer.render(task)[1] == 1
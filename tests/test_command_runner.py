@@ -0,0 +1,83 @@
+import asyncio
+import sys
+import time
+from pathlib import Path
+import pytest
+from taskaway.command_runner import TaskCommandError, TaskCommandRunner
+
+# Logs when each command starts and ends, sleeping for sleep=<seconds> and exiting with exit=<status>
+SCRIPT = """import sys, time
+args = dict(arg.split("=", 1) for arg in sys.argv[1:] if "=" in arg and not arg.startswith("rc."))
+with open({log!r}, "a") as f:
+    f.write(f"{{args['name']}} start {{time.time()}}\\n")
+time.sleep(float(args.get("sleep", 0)))
+with open({log!r}, "a") as f:
+    f.write(f"{{args['name']}} end {{time.time()}}\\n")
+sys.stderr.write(args.get("error", ""))
+sys.exit(int(args.get("exit", 0)))
+"""
+
+
+def make_runner(tmp_path: Path, **kwargs) -> TaskCommandRunner:
+    script: Path = tmp_path / "task.py"
+    script.write_text(SCRIPT.format(log=str(tmp_path / "log")))
+    return TaskCommandRunner(f"{sys.executable} {script}", tmp_path / "taskrc", **kwargs)
+
+
+def read_intervals(tmp_path: Path) -> dict[str, tuple[float, float]]:
+    times: dict[str, dict[str, float]] = {}
+    for line in (tmp_path / "log").read_text().splitlines():
+        name, event, timestamp = line.split()
+        times.setdefault(name, {})[event] = float(timestamp)
+    return {name: (events["start"], events["end"]) for name, events in times.items()}
+
+
+def test_commands_for_the_same_task_run_in_start_order(tmp_path: Path):
+    runner = make_runner(tmp_path)
+
+    async def run() -> None:
+        await asyncio.gather(
+            runner.run(["name=first", "sleep=0.3"], ["a"]),
+            runner.run(["name=second", "sleep=0.1"], ["b", "a"]),
+            runner.run(["name=third"], ["a"]),
+            runner.run(["name=other", "sleep=0.1"], ["c"]),
+        )
+
+    asyncio.run(run())
+    intervals = read_intervals(tmp_path)
+    assert intervals["first"][1] <= intervals["second"][0]
+    assert intervals["second"][1] <= intervals["third"][0]
+    # Commands for other tasks don't wait
+    assert intervals["other"][0] < intervals["first"][1]
+    assert runner.uuid_locks == {} and runner.uuid_lock_users == {}
+
+
+def test_at_most_max_concurrent_commands_run_at_once(tmp_path: Path):
+    runner = make_runner(tmp_path, max_concurrent=2)
+
+    async def run() -> None:
+        await asyncio.gather(*(runner.run([f"name={number}", "sleep=0.2"], [str(number)]) for number in range(6)))
+
+    asyncio.run(run())
+    intervals = read_intervals(tmp_path).values()
+    overlaps: list[int] = [sum(start <= at < end for start, end in intervals) for at, _ in intervals]
+    assert max(overlaps) == 2
+
+
+def test_commands_are_killed_after_the_timeout(tmp_path: Path):
+    runner = make_runner(tmp_path, timeout=0.5)
+    start: float = time.perf_counter()
+    with pytest.raises(TaskCommandError, match="Timed out after 0.5s"):
+        asyncio.run(runner.run(["name=slow", "sleep=10"]))
+    assert time.perf_counter() - start < 5
+    assert "slow end" not in (tmp_path / "log").read_text()
+
+
+def test_failures_raise_task_command_error(tmp_path: Path):
+    runner = make_runner(tmp_path)
+    with pytest.raises(TaskCommandError, match="No matches"):
+        asyncio.run(runner.run(["name=failing", "exit=1", "error=No matches."]))
+
+    missing = TaskCommandRunner(str(tmp_path / "missing-task"), tmp_path / "taskrc")
+    with pytest.raises(TaskCommandError, match="missing-task"):
+        asyncio.run(missing.run(["list"]))
@@ -0,0 +1,153 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+import pytest
+from benchmarks.generate_tasks import write_data_set
+from taskaway.perf import PerfStats
+from taskaway.row_sort import RowSorter
+from taskaway.task_export import TaskExportError, TaskExporter
+from taskaway.task_source import SyncResult, TaskSource, TaskSources
+from taskaway.task_store import TaskStore
+from taskaway.taskaway_types import ColumnSchema, ViewState
+
+FAKE_TASK: Path = Path(__file__).resolve().parent.parent / "benchmarks" / "fake_task.py"
+TASK_COMMAND: str = f"{sys.executable} {FAKE_TASK}"
+
+
+def make_view(project_filter: str = "") -> ViewState:
+    return ViewState(project_filter, [], set(), ColumnSchema([]), RowSorter("project+"))
+
+
+def run_task(taskrc: Path, *args: str) -> None:
+    subprocess.run([sys.executable, str(FAKE_TASK), *args], env={**os.environ, "TASKRC": str(taskrc)}, check=True)
+
+
+def get_exported(taskrc: Path) -> dict[str, object]:
+    return {task.uuid: task.modified for task in TaskExporter(TASK_COMMAND, taskrc).export(["status:pending"])}
+
+
+def get_stored(store: TaskStore) -> dict[str, object]:
+    return {uuid: task.modified for uuid, task in store.tasks.items()}
+
+
+def sync(source: TaskSource, store: TaskStore, view: ViewState) -> SyncResult:
+    known, stale = store.get_sync_uuids()
+    result: SyncResult = source.sync(view, known.get(source.name, set()), stale.get(source.name, set()))
+    store.merge(result.tasks, result.removed, result.present, result.source)
+    return result
+
+
+@pytest.fixture
+def taskrc(tmp_path: Path) -> Path:
+    return write_data_set(tmp_path, 300)
+
+
+@pytest.fixture
+def source(taskrc: Path) -> TaskSource:
+    return TaskSource(name=None, task_command=TASK_COMMAND, taskrc=taskrc, perf=PerfStats(), delta_sync=True)
+
+
+def test_delta_sync_exports_only_changed_tasks(taskrc: Path, source: TaskSource):
+    store = TaskStore()
+    view = make_view()
+    first = sync(source, store, view)
+    assert len(first.tasks) == 300 and first.present is not None
+    assert get_stored(store) == get_exported(taskrc)
+
+    unchanged = sync(source, store, view)
+    assert unchanged.present is None
+    # Only tasks modified in the same second as the latest one are exported again
+    assert len(unchanged.tasks) < 5
+
+    modified, *completed = list(store.tasks)[:3]
+    run_task(taskrc, modified, "modify", "project:moved")
+    # Batched commands pass a list of uuids
+    run_task(taskrc, *completed, "done")
+    run_task(taskrc, "add", "a new task")
+    changes = sync(source, store, view)
+    assert set(completed) <= changes.removed
+    assert len(changes.tasks) < 10
+    assert store.tasks[modified].project == "moved"
+    assert get_stored(store) == get_exported(taskrc)
+
+
+def test_listing_finds_tasks_removed_or_added_without_being_modified(taskrc: Path, source: TaskSource):
+    store = TaskStore()
+    view = make_view()
+    sync(source, store, view)
+
+    # Replace the data file behind the exporter's back, keeping the old modified times
+    pending: Path = taskrc.parent / "data" / "pending.data"
+    lines: list[str] = pending.read_text().splitlines()
+    removed: str = json.loads(lines[0])["uuid"]
+    restored: str = json.loads(lines[1])["uuid"]
+    pending.write_text("\n".join(lines[1:]) + "\n")
+    store.remove_task(restored)
+
+    sync(source, store, view)
+    assert removed in store.tasks and restored not in store.tasks
+
+    source.last_listing = 0.0
+    listed = sync(source, store, view)
+    assert listed.present is not None
+    assert removed not in store.tasks and restored in store.tasks
+    assert get_stored(store) == get_exported(taskrc)
+
+
+def test_local_copies_are_exported_again(taskrc: Path, source: TaskSource):
+    store = TaskStore()
+    view = make_view()
+    sync(source, store, view)
+
+    uuid: str = next(iter(store.tasks))
+    local = store.tasks[uuid].copy()
+    local.apply_modify_arguments(["project:local"])
+    store.begin_local_change(uuid, local)
+    store.end_local_change(uuid)
+    assert store.get_sync_uuids()[1] == {None: {uuid}}
+
+    sync(source, store, view)
+    assert store.tasks[uuid].modified is not None
+    assert get_stored(store) == get_exported(taskrc)
+
+
+def test_filter_change_starts_with_a_full_export(taskrc: Path, source: TaskSource):
+    store = TaskStore()
+    sync(source, store, make_view())
+    project: str = next(task.project for task in store.tasks.values() if task.project)
+
+    filtered = sync(source, store, make_view(project))
+    assert filtered.present is not None
+    assert all(task.project and (task.project + ".").startswith(f"{project}.") for task in store.tasks.values())
+
+
+def test_failed_sync_leaves_every_source_as_it_was(tmp_path: Path):
+    good: Path = write_data_set(tmp_path / "good", 50)
+    broken: Path = tmp_path / "broken" / "taskrc"
+    broken.parent.mkdir()
+    broken.write_text("")
+    sources = TaskSources({"good": good, "broken": broken}, TASK_COMMAND, PerfStats(), delta_sync=True)
+    with pytest.raises(TaskExportError):
+        sources.sync(make_view(), {}, {})
+    # The good source's export went through, but as nothing was merged it must start over
+    assert all(source.modified_mark is None and source.synced_filter is None for source in sources.sources)
+
+
+def test_tasks_edited_out_of_the_view_are_removed(taskrc: Path, source: TaskSource):
+    store = TaskStore()
+    sync(source, store, make_view())
+    project: str = next(task.project for task in store.tasks.values() if task.project)
+    store = TaskStore()
+    view = make_view(project)
+    sync(source, store, view)
+
+    moved: str = next(iter(store.tasks))
+    run_task(taskrc, moved, "modify", "project:elsewhere")
+    changes = sync(source, store, view)
+    assert changes.present is None and moved in changes.removed
+    assert moved not in store.tasks
+    assert get_stored(store) == {
+        task.uuid: task.modified for task in source.exporter.export_pending([f"project:{project}"])
+    }
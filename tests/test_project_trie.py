@@ -0,0 +1,102 @@
+import random
+from typing import Optional
+from taskaway.utils import ProjectTrie, get_project_prefixes
+
+PROJECTS = [None, "home", "home.garden", "home.garden.shed", "work", "work.reports", "work.reports.q3"]
+
+
+def check_counts(trie: ProjectTrie, tasks: dict[str, Optional[str]]) -> None:
+    """Compares every node against counts made from scratch"""
+    expected: set[str] = {prefix for project in tasks.values() if project for prefix in get_project_prefixes(project)}
+    assert set(trie.get_projects()) == expected
+    assert trie.root.subtree_task_count == len(tasks)
+    for path, node in trie.nodes.items():
+        assert node.tasks == {uuid for uuid, project in tasks.items() if (project or "") == path}
+        in_subtree = [project for project in tasks.values() if not path or path in get_project_prefixes(project or "")]
+        assert node.subtree_task_count == len(in_subtree)
+        assert node.subtree_task_count > 0 or node is trie.root
+        assert all(child.parent is node and child.path in trie.nodes for child in node.children.values())
+
+
+def test_counts_match_tasks_as_they_are_added_and_removed():
+    rng = random.Random(0)
+    trie = ProjectTrie()
+    tasks: dict[str, Optional[str]] = {}
+    for step in range(500):
+        uuid = f"task-{rng.randint(0, 40)}"
+        if uuid in tasks:
+            trie.remove_task(tasks.pop(uuid), uuid)
+        else:
+            tasks[uuid] = rng.choice(PROJECTS)
+            trie.add_task(tasks[uuid], uuid)
+        check_counts(trie, tasks)
+
+
+def test_removing_an_unknown_task_changes_nothing():
+    trie = ProjectTrie()
+    trie.add_task("work", "a")
+    trie.remove_task("work", "b")
+    trie.remove_task("home", "a")
+    check_counts(trie, {"a": "work"})
+
+
+def test_empty_projects_are_pruned():
+    trie = ProjectTrie()
+    trie.add_task("work.reports.q3", "a")
+    trie.add_task("work", "b")
+    assert trie.get_projects() == ["work", "work.reports", "work.reports.q3"]
+
+    trie.remove_task("work.reports.q3", "a")
+    assert trie.get_projects() == ["work"]
+    assert trie.nodes["work"].children == {}
+    trie.remove_task("work", "b")
+    assert trie.get_projects() == [] and trie.root.children == {}
+
+
+def test_pruned_projects_are_expanded_again_when_they_come_back():
+    trie = ProjectTrie()
+    trie.add_task("work.reports", "a")
+    trie.add_task("home", "b")
+    trie.expand(["work", "work.reports", "missing"])
+    assert trie.get_expanded_projects() == {"", "work", "work.reports"}
+
+    trie.remove_task("work.reports", "a")
+    assert trie.get_expanded_projects() == {""}
+    trie.add_task("work.reports", "c")
+    assert trie.get_expanded_projects() == {"", "work", "work.reports"}
+    assert not trie.nodes["home"].expanded
+
+
+def test_collapsing_a_project_collapses_its_sub_projects():
+    trie = ProjectTrie()
+    trie.add_task("work.reports.q3", "a")
+    trie.add_task("work.meetings", "b")
+    trie.add_task("workshop", "c")
+    trie.expand(["work", "work.reports", "work.reports.q3", "workshop"])
+    trie.toggle_expanded("work.meetings")
+    assert trie.nodes["work.meetings"].expanded
+
+    # A pruned sub project must not come back expanded once its parent was collapsed
+    trie.remove_task("work.meetings", "b")
+    trie.toggle_expanded("work")
+    trie.add_task("work.meetings", "b")
+    assert trie.get_expanded_projects() == {"", "workshop"}
+    assert not any(trie.nodes[path].expanded for path in ["work.reports", "work.reports.q3", "work.meetings"])
+
+    # Expanding only expands the project itself, and the root can't be collapsed
+    trie.toggle_expanded("work")
+    trie.toggle_expanded("")
+    trie.toggle_expanded("missing")
+    assert trie.get_expanded_projects() == {"", "work", "workshop"}
+
+
+def test_is_in_subtree():
+    trie = ProjectTrie()
+    trie.add_task("work.reports", "a")
+    trie.add_task("workshop", "b")
+    assert trie.is_in_subtree("work.reports", "work")
+    assert trie.is_in_subtree("work", "work")
+    assert trie.is_in_subtree("workshop", "")
+    assert not trie.is_in_subtree("workshop", "work")
+    assert not trie.is_in_subtree("work", "work.reports")
+    assert not trie.is_in_subtree("missing", "")
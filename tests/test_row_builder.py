@@ -0,0 +1,66 @@
+from datetime import datetime, timedelta, timezone
+from taskaway.annotation_renderer import AnnotationRenderer
+from taskaway.constants import COL_ACTIVE, COL_AGE, COL_DESCRIPTION, COL_DUE, COL_URGENCY
+from taskaway.row_builder import COMPACT_MIN_ENTRIES, RowBuilder
+from taskaway.task_export import TaskRecord, format_task_date
+from taskaway.task_store import TaskStore
+
+NOW = datetime(2025, 6, 1, 12, 0, 0, tzinfo=timezone.utc)
+COLUMNS = [COL_DESCRIPTION, COL_URGENCY, COL_AGE, COL_DUE, COL_ACTIVE]
+
+
+def make_task(uuid: str, urgency: float = 1.0, due: datetime = NOW + timedelta(days=30)) -> TaskRecord:
+    return TaskRecord(
+        {
+            "uuid": uuid,
+            "description": uuid,
+            "urgency": urgency,
+            "modified": "20250101T093000Z",
+            "entry": "20250101T093000Z",
+            "due": format_task_date(due),
+        }
+    )
+
+
+def test_exports_that_only_change_urgency_reuse_the_row():
+    store = TaskStore()
+    builder = RowBuilder(COLUMNS, AnnotationRenderer())
+    for export in range(20):
+        changed = store.update([make_task(f"task-{number}", urgency=export) for number in range(2000)])
+        assert len(changed) == 2000
+        builder.remove(uuid for uuid in changed if uuid not in store.tasks)
+        for task in store.tasks.values():
+            assert builder.build(task, NOW + timedelta(seconds=export))[0][1] == export
+    assert builder.rows_built == 2000
+    # Blank active cells are cached too, they never expire so have no heap entries
+    assert len(builder.time_cache.cells) == 2000 * 3
+    assert len(builder.time_cache.deadlines) <= 2 * len(builder.time_cache.cells) + COMPACT_MIN_ENTRIES
+
+
+def test_time_cells_are_recomputed_when_their_dates_change():
+    builder = RowBuilder(COLUMNS, AnnotationRenderer())
+    assert builder.build(make_task("a"), NOW)[0][3] == "30d"
+    assert builder.build(make_task("a", due=NOW - timedelta(days=2)), NOW)[0][3] == "-2d"
+
+
+def test_removed_tasks_leave_no_heap_entries_behind():
+    builder = RowBuilder(COLUMNS, AnnotationRenderer())
+    for batch in range(10):
+        uuids = [f"task-{batch}-{number}" for number in range(1000)]
+        for uuid in uuids:
+            builder.build(make_task(uuid), NOW)
+        builder.remove(uuids)
+    assert builder.time_cache.cells == {}
+    assert len(builder.time_cache.deadlines) <= COMPACT_MIN_ENTRIES
+
+
+def test_local_copies_are_rebuilt_until_exported():
+    builder = RowBuilder(COLUMNS, AnnotationRenderer())
+    task = make_task("a")
+    builder.build(task, NOW)
+    local = task.copy()
+    local.description = "edited"
+    builder.forget(["a"])
+    assert builder.build(local, NOW)[0][0] == "edited"
+    assert builder.build(task, NOW)[0][0] == "a"
+    assert builder.rows_built == 3
@@ -0,0 +1,113 @@
+import random
+from typing import Any, Optional
+import pytest
+from taskaway.row_model import RowModel
+from taskaway.row_sort import RowSorter, RowSortKey, parse_sort_order
+from taskaway.task_export import TaskRecord
+from taskaway.taskaway_types import ColumnSchema, TableRow
+
+PROJECTS = [None, "home", "home.garden", "work", "work.reports"]
+
+
+def make_task(uuid: str, modified: str = "20250101T093000Z", **fields: Any) -> TaskRecord:
+    return TaskRecord({"uuid": uuid, "status": "pending", "modified": modified, **fields})
+
+
+def get_sort_keys(sorter: RowSorter, tasks: list[TaskRecord]) -> dict[str, RowSortKey]:
+    sort_keys: dict[str, RowSortKey] = {task.uuid: sorter.get_task_key(task) for task in tasks}
+    for task in tasks:
+        if task.project:
+            sort_keys[task.project] = sorter.get_project_key(task.project)
+    return sort_keys
+
+
+def get_order(sorter: RowSorter, tasks: list[TaskRecord]) -> list[str]:
+    return [key[-1] for key in sorted(get_sort_keys(sorter, tasks).values())]
+
+
+def test_parse_sort_order():
+    assert parse_sort_order("urgency-, due+,age,") == [("urgency", True), ("due", False), ("age", False)]
+    assert parse_sort_order("") == []
+
+
+@pytest.mark.parametrize("sort_order", ["priority+", "due+-", "due*"])
+def test_parse_sort_order_rejects_invalid(sort_order: str):
+    with pytest.raises(ValueError):
+        parse_sort_order(sort_order)
+
+
+def test_active_tasks_come_first_most_recently_started_first():
+    tasks = [
+        make_task("a", description="a", project="work"),
+        make_task("b", description="b", start="20250102T093000Z"),
+        make_task("c", description="c", project="work", start="20250103T093000Z"),
+    ]
+    assert get_order(RowSorter("description+"), tasks) == ["c", "b", "work", "a"]
+
+
+def test_projects_group_their_tasks():
+    tasks = [
+        make_task("a", description="a", project="work"),
+        make_task("b", description="b"),
+        make_task("c", description="c", project="home"),
+    ]
+    assert get_order(RowSorter("description+"), tasks) == ["b", "home", "c", "work", "a"]
+
+
+def test_descending_fields_and_missing_values():
+    tasks = [
+        make_task("a", description="apple", urgency=1.0),
+        make_task("b", description="banana", urgency=5.0, due="20250105T093000Z"),
+        make_task("c", description="cherry", urgency=5.0),
+        make_task("d", description="date", urgency=3.0, due="20250101T093000Z"),
+    ]
+    assert get_order(RowSorter("urgency-,description-"), tasks) == ["c", "b", "d", "a"]
+    # Tasks without a due date sort last in either direction
+    assert get_order(RowSorter("due+,description+"), tasks) == ["d", "b", "a", "c"]
+    assert get_order(RowSorter("due-,description+"), tasks) == ["b", "d", "a", "c"]
+
+
+def make_random_task(rng: random.Random, uuid: str, modified: str) -> TaskRecord:
+    fields: dict[str, Any] = {"description": rng.choice(["alpha", "beta", "gamma", "delta"]), "urgency": rng.random()}
+    project: Optional[str] = rng.choice(PROJECTS)
+    if project is not None:
+        fields["project"] = project
+    if rng.random() < 0.3:
+        fields["due"] = f"202501{rng.randint(10, 28)}T093000Z"
+    if rng.random() < 0.1:
+        fields["start"] = f"202501{rng.randint(10, 28)}T093000Z"
+    return make_task(uuid, modified, **fields)
+
+
+@pytest.mark.parametrize("changes_per_step", [3, 200])
+def test_incremental_row_model_matches_full_sort(changes_per_step: int):
+    rng = random.Random(changes_per_step)
+    sorter = RowSorter("due+,urgency-,description+")
+    schema = ColumnSchema([])
+    tasks: dict[str, TaskRecord] = {}
+    for number in range(300):
+        tasks[f"task-{number}"] = make_random_task(rng, f"task-{number}", "20250101T093000Z")
+    model = RowModel(sorter, schema)
+    added: int = 0
+
+    for step in range(30):
+        modified = f"202502{step + 1:02d}T093000Z"
+        for _ in range(changes_per_step):
+            uuid = rng.choice(list(tasks))
+            action = rng.random()
+            if action < 0.2:
+                del tasks[uuid]
+            elif action < 0.4:
+                added += 1
+                new_uuid = f"added-{added}"
+                tasks[new_uuid] = make_random_task(rng, new_uuid, modified)
+            else:
+                tasks[uuid] = make_random_task(rng, uuid, modified)
+
+        sort_keys = get_sort_keys(sorter, list(tasks.values()))
+        rows: dict[str, TableRow] = {key: ([], 1) for key in sort_keys}
+        model.update(rows, sort_keys, schema)
+        assert model.get_keys(0, len(model)) == [key[-1] for key in sorted(sort_keys.values())]
+        for key in rng.sample(list(sort_keys), 10):
+            index: Optional[int] = model.get_index(key)
+            assert index is not None and model.get_keys(index, index + 1) == [key]
@@ -0,0 +1,59 @@
+import random
+import re
+from taskaway.search_index import SearchIndex
+from taskaway.task_export import TaskRecord
+
+WORDS = ["Garden", "gate", "report", "reporting", "q3", "budget", "call", "recall", "mum", "mumbai", "Naïve"]
+
+
+def make_task(rng: random.Random, uuid: str) -> TaskRecord:
+    annotations = [{"entry": "20250101T093000Z", "description": " ".join(rng.sample(WORDS, 2))}]
+    return TaskRecord(
+        {
+            "uuid": uuid,
+            "description": " ".join(rng.sample(WORDS, rng.randint(1, 3))) + rng.choice(["", ",", "!"]),
+            "tags": rng.sample(["home", "work", "errand"], rng.randint(0, 2)),
+            "annotations": annotations if rng.random() < 0.3 else [],
+        }
+    )
+
+
+def brute_force_search(tasks: dict[str, TaskRecord], query: str) -> set[str]:
+    """Matches every word of the query as a substring of a word of the task's text"""
+    words = re.findall(r"\w+", query.lower())
+    matches: set[str] = set()
+    for uuid, task in tasks.items():
+        texts = [task.description, *task.tags] + [annotation["description"] for annotation in task.raw_annotations]
+        tokens = re.findall(r"\w+", " ".join(texts).lower())
+        if all(any(word in token for token in tokens) for word in words):
+            matches.add(uuid)
+    return matches
+
+
+def test_search_matches_brute_force_as_tasks_change_and_words_are_typed():
+    rng = random.Random(1)
+    tasks: dict[str, TaskRecord] = {}
+    index = SearchIndex()
+    for step in range(300):
+        uuid = f"task-{rng.randint(0, 80)}"
+        if uuid in tasks and rng.random() < 0.3:
+            del tasks[uuid]
+            index.remove(uuid)
+        else:
+            tasks[uuid] = make_task(rng, uuid)
+            index.add(tasks[uuid])
+
+        # Type a query a character at a time, as the search screen does
+        query = " ".join(rng.sample(WORDS, rng.randint(1, 2))).lower()
+        for end in range(1, len(query) + 1):
+            assert index.search(query[:end]) == brute_force_search(tasks, query[:end]), query[:end]
+        assert len(index) == len(tasks)
+
+
+def test_empty_query_matches_every_task():
+    index = SearchIndex()
+    index.add(TaskRecord({"uuid": "a", "description": "first"}))
+    index.add(TaskRecord({"uuid": "b", "description": "second"}))
+    assert index.search("") == {"a", "b"}
+    assert index.search("  ,") == {"a", "b"}
+    assert index.search("zzz") == set()
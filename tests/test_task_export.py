@@ -0,0 +1,86 @@
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+import pytest
+from taskaway.task_export import TaskExportError, TaskExporter, TaskRecord
+
+
+def make_exporter(tmp_path: Path, output: str, exit_code: int = 0, error: str = "") -> TaskExporter:
+    """Returns an exporter whose task command prints output and error then exits with exit_code"""
+    script: Path = tmp_path / "task.py"
+    script.write_text(
+        "import sys\n" f"sys.stdout.write({output!r})\n" f"sys.stderr.write({error!r})\n" f"sys.exit({exit_code})\n"
+    )
+    return TaskExporter(f"{sys.executable} {script}", tmp_path / "taskrc")
+
+
+def test_missing_fields_have_defaults():
+    task = TaskRecord({"uuid": "a"})
+    assert (task.description, task.project, task.tags, task.urgency, task.status) == ("", None, [], 0.0, "")
+    assert task.modified is None and not task.active
+    assert task["entry"] is None and task["due"] is None and task["start"] is None and task["modified"] is None
+    assert task["annotations"] == []
+    assert task.to_dict() == {"uuid": "a", "description": "", "status": "", "urgency": 0.0}
+
+
+def test_fields_are_read_like_a_tasklib_task():
+    data = {
+        "uuid": "a",
+        "description": "write report",
+        "project": "work",
+        "tags": ["q3"],
+        "urgency": 4.5,
+        "status": "pending",
+        "entry": "20250101T093000Z",
+        "due": "20250301T170000Z",
+        "start": "20250102T080000Z",
+        "modified": "20250102T080000Z",
+        "annotations": [{"entry": "20250102T081500Z", "description": "started"}],
+        "estimate": "2h",
+    }
+    task = TaskRecord(data)
+    assert task["description"] == "write report" and task["project"] == "work" and task["tags"] == ["q3"]
+    assert task["due"] == datetime(2025, 3, 1, 17, 0, 0, tzinfo=timezone.utc)
+    assert task["modified"] == datetime(2025, 1, 2, 8, 0, 0, tzinfo=timezone.utc)
+    annotation = {"entry": datetime(2025, 1, 2, 8, 15, tzinfo=timezone.utc), "description": "started"}
+    assert task["annotations"] == [annotation]
+    assert task.active
+    with pytest.raises(KeyError):
+        task["estimate"]
+
+    # Fields taskaway doesn't display are dropped
+    del data["estimate"]
+    assert task.to_dict() == data
+    assert TaskRecord(task.to_dict()).to_dict() == data
+
+
+def test_copy_is_independent_and_has_no_modified_time():
+    task = TaskRecord({"uuid": "a", "tags": ["home"], "modified": "20250102T080000Z"})
+    task["entry"]
+    copy = task.copy()
+    copy.apply_modify_arguments(["project:garden", "+errand", "-home"])
+    copy.set_started(datetime(2025, 1, 3, tzinfo=timezone.utc))
+    copy.add_annotation("note", datetime(2025, 1, 3, tzinfo=timezone.utc))
+    assert (copy.project, copy.tags, copy.modified) == ("garden", ["errand"], None)
+    assert copy.active and len(copy["annotations"]) == 1
+    assert (task.project, task.tags, task.modified) == (None, ["home"], "20250102T080000Z")
+    assert not task.active and task["annotations"] == []
+
+
+def test_export_reads_one_task_per_line(tmp_path: Path):
+    output = '[\n{"uuid": "a", "description": "first"},\n{"uuid": "b"}\n]\n'
+    tasks = list(make_exporter(tmp_path, output).export([]))
+    assert [(task.uuid, task.description) for task in tasks] == [("a", "first"), ("b", "")]
+
+
+@pytest.mark.parametrize("line", ['{"uuid": "a"', '{"description": "no uuid"}', "not json"])
+def test_export_rejects_invalid_lines(tmp_path: Path, line: str):
+    with pytest.raises(TaskExportError, match="Invalid task export line"):
+        list(make_exporter(tmp_path, f'{{"uuid": "a"}}\n{line}\n').export([]))
+
+
+def test_export_failure_includes_stderr(tmp_path: Path):
+    with pytest.raises(TaskExportError, match="Unable to read data"):
+        list(make_exporter(tmp_path, "", exit_code=2, error="Unable to read data").export([]))
+    with pytest.raises(TaskExportError, match="Unable to read data"):
+        make_exporter(tmp_path, "", exit_code=2, error="Unable to read data").list_uuids([])
@@ -0,0 +1,55 @@
+from datetime import timedelta
+import pytest
+from taskaway.utils import get_time_representation, get_time_representation_expiry
+
+MINUTE = 60
+HOUR = 60 * MINUTE
+DAY = 24 * HOUR
+YEAR = 365 * DAY
+EPSILON = 0.001
+
+# Either side of every unit boundary, in both directions from now
+SECONDS = [
+    magnitude * sign
+    for magnitude in [1, 1.5, 30, 59, 59.999, 60, 61, 119.5, HOUR - 1, HOUR, HOUR + 1, DAY - 1, DAY, DAY + 1.25]
+    + [YEAR - 1, YEAR, YEAR + 1, 2 * YEAR + 0.5]
+    for sign in (1, -1)
+]
+
+
+@pytest.mark.parametrize("rate", [1, -1])
+@pytest.mark.parametrize("seconds", SECONDS)
+def test_expiry_is_never_late(seconds: float, rate: int):
+    delta = timedelta(seconds=seconds)
+    expiry = get_time_representation_expiry(delta, rate)
+    assert expiry >= 0
+
+    representation = get_time_representation(delta)
+    for elapsed in [0, expiry / 4, expiry / 2, expiry - EPSILON]:
+        if 0 <= elapsed < expiry:
+            assert get_time_representation(delta + timedelta(seconds=rate * elapsed)) == representation
+
+
+@pytest.mark.parametrize("rate", [1, -1])
+@pytest.mark.parametrize("seconds", SECONDS)
+def test_expiry_is_not_early_away_from_zero(seconds: float, rate: int):
+    delta = timedelta(seconds=seconds)
+    expiry = get_time_representation_expiry(delta, rate)
+    changed = get_time_representation(delta + timedelta(seconds=rate * (expiry + EPSILON)))
+    assert changed != get_time_representation(delta)
+
+
+@pytest.mark.parametrize(
+    "seconds,rate,expected",
+    [
+        (59.5, 1, 0.5),
+        (60, 1, 60),
+        (60, -1, 0),
+        (HOUR + 30, -1, 30),
+        (-(DAY - 1), 1, HOUR - 1),
+        (-(DAY - 1), -1, 1),
+        (YEAR + DAY, 1, YEAR - DAY),
+    ],
+)
+def test_expiry_at_unit_boundaries(seconds: float, rate: int, expected: float):
+    assert get_time_representation_expiry(timedelta(seconds=seconds), rate) == pytest.approx(expected)
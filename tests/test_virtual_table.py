@@ -0,0 +1,53 @@
+import asyncio
+import sys
+from pathlib import Path
+from textual import events
+from benchmarks.generate_tasks import write_data_set
+from taskaway.constants import VIRTUAL_TABLE_WINDOW_ROWS
+from taskaway.main import MainWindow
+
+FAKE_TASK: Path = Path(__file__).resolve().parent.parent / "benchmarks" / "fake_task.py"
+
+
+async def scroll_to_end(app: MainWindow, pilot, down: bool) -> None:
+    table = app.get_table()
+    event = events.MouseScrollDown if down else events.MouseScrollUp
+    for _ in range(2000):
+        first_row, last_row = table.get_visible_rows()
+        if (app.window_start + last_row == len(app.row_model) - 1) if down else (app.window_start + first_row == 0):
+            return
+        for _ in range(10):
+            table.post_message(event(table, 5, 5, 0, 1 if down else -1, 0, False, False, False))
+        await pilot.pause()
+    raise AssertionError("scrolling stopped before the end of the rows")
+
+
+def test_wheel_scrolls_through_every_row(tmp_path: Path):
+    write_data_set(tmp_path, 600)
+    app = MainWindow(
+        task_configs={"test": tmp_path / "taskrc"},
+        taskaway_config=tmp_path / "taskaway.json",
+        task_command=f"{sys.executable} {FAKE_TASK}",
+    )
+
+    async def run() -> None:
+        async with app.run_test(size=(120, 30)) as pilot:
+            while app.loaded_signature is None or app.refresh_view is not None:
+                await pilot.pause(0.05)
+            for node in app.store.projects.nodes.values():
+                node.expanded = True
+            app.redraw(rebuild=True)
+            await pilot.pause()
+            assert len(app.row_model) > VIRTUAL_TABLE_WINDOW_ROWS * 2
+
+            table = app.get_table()
+            await scroll_to_end(app, pilot, down=True)
+            first_row, last_row = table.get_visible_rows()
+            visible_keys = [row.key.value for row in table.ordered_rows][first_row:]
+            assert app.window_start > 0
+            assert visible_keys == app.row_model.get_keys(app.window_start + first_row, len(app.row_model))
+
+            await scroll_to_end(app, pilot, down=False)
+            assert app.window_start == 0
+
+    asyncio.run(run())